@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análisis de Registros de Escaneo QR
+Sistema de Navegación Interior - UMAG
+
+Este script procesa los registros de escaneo exportados por la aplicación
+(archivos JSONL, opcionalmente comprimidos con gzip) y resume en una sola
+pasada:
+- Qué stickers se escanean más (por nodo y por piso)
+- Qué contenidos de QR fallan la validación y por qué
+- Qué pares origen → destino se usan más (candidatos a rutas precalculadas)
+
+Formato esperado de cada línea:
+    {"ts": "2025-12-01T10:15:00", "qr": "nodo:P1_Entrada_1", "destino": "P1_Sala_50"}
+
+El campo "qr" (o "payload") es el contenido leído del código. El campo
+"destino" es opcional y corresponde al destino elegido después del escaneo.
+
+Uso:
+    python analizar_escaneos.py escaneos.jsonl [--top 20] [--salida resumen.json]
+    python analizar_escaneos.py --sintetico 2000000 escaneos_prueba.jsonl
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+# Importar funciones de los scripts existentes
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import RUTA_ALIAS_DART, crear_datos_qr, iterar_nodos_json, leer_alias_dart
+from verificar_formato_qr import verificar_qr_lote
+
+# Registros procesados por lote de validación
+TAMANO_LOTE = 50_000
+
+# Límites de memoria: los registros de teléfonos traen contenidos corruptos
+# casi siempre distintos, así que ni la caché de validación ni el detalle de
+# fallos pueden crecer con cada contenido nuevo
+LIMITE_CACHE = 50_000
+LIMITE_FALLOS_DISTINTOS = 20_000
+
+
+def abrir_registro(ruta):
+    """Abre un archivo de registro en modo binario, descomprimiendo si es .gz."""
+    if str(ruta).endswith('.gz'):
+        return gzip.open(ruta, 'rb')
+    return open(ruta, 'rb', buffering=1024 * 1024)
+
+
+def cargar_nodos_conocidos(directorio_base):
+    """
+    Lee los IDs de nodo de todos los pisos.
+
+    Returns:
+        dict: ID de nodo -> número de piso
+    """
+    nodos = {}
+    for piso in (1, 2, 3, 4):
+        ruta_grafo = directorio_base / f'lib/data/grafo_piso{piso}.json'
+        if ruta_grafo.exists():
+            for nodo in iterar_nodos_json(str(ruta_grafo)):
+                if nodo.get('id'):
+                    nodos[nodo['id']] = piso
+    return nodos
+
+
+class ResumenEscaneos:
+    """Contadores agregados de una o más pasadas sobre registros de escaneo."""
+
+    def __init__(self, nodos_conocidos):
+        self.nodos_conocidos = nodos_conocidos
+        self.registros = 0
+        self.lineas_invalidas = 0
+        self.validos = 0
+        self.invalidos = 0
+        self.fallos_sin_detalle = 0
+        self.por_nodo = Counter()
+        self.por_piso = Counter()
+        self.por_tipo = Counter()
+        self.rutas = Counter()
+        self.fallos = Counter()
+        self.motivos_fallo = {}
+
+    def agregar_lote(self, payloads, destinos, resultados):
+        """Acumula un lote de registros ya validados."""
+        nodos_conocidos = self.nodos_conocidos
+        for qr_data, destino, (es_valido, mensaje, datos) in zip(payloads, destinos, resultados):
+            if es_valido:
+                tipo = datos['type']
+                if tipo == 'nodo' and nodos_conocidos and datos['id'] not in nodos_conocidos:
+                    es_valido = False
+                    mensaje = f"Nodo desconocido: {datos['id']}"
+                elif tipo == 'ruta' and nodos_conocidos and (
+                        datos['origen'] not in nodos_conocidos
+                        or datos['destino'] not in nodos_conocidos):
+                    es_valido = False
+                    mensaje = "Ruta con nodos desconocidos"
+
+            if not es_valido:
+                self.invalidos += 1
+                if qr_data not in self.fallos and len(self.fallos) >= LIMITE_FALLOS_DISTINTOS:
+                    self.podar_fallos()
+                self.fallos[qr_data] += 1
+                self.motivos_fallo.setdefault(qr_data, mensaje)
+                continue
+
+            self.validos += 1
+            self.por_tipo[tipo] += 1
+            if tipo == 'nodo':
+                nodo_id = datos['id']
+                self.por_nodo[nodo_id] += 1
+                self.por_piso[nodos_conocidos.get(nodo_id, datos.get('piso'))] += 1
+                # Solo destinos existentes, para que los pares no crezcan con basura
+                if (destino and destino != nodo_id
+                        and (not nodos_conocidos or destino in nodos_conocidos)):
+                    self.rutas[(nodo_id, destino)] += 1
+            elif tipo == 'ruta':
+                self.rutas[(datos['origen'], datos['destino'])] += 1
+
+    def podar_fallos(self):
+        """
+        Descarta la mitad menos frecuente del detalle de fallos.
+
+        Los contenidos descartados siguen contados en 'invalidos'; si vuelven
+        a aparecer se cuentan desde cero, por lo que las cifras por contenido
+        son un mínimo cuando hubo poda.
+        """
+        conservados = self.fallos.most_common(LIMITE_FALLOS_DISTINTOS // 2)
+        self.fallos_sin_detalle += sum(self.fallos.values()) - sum(c for _, c in conservados)
+        self.fallos = Counter(dict(conservados))
+        self.motivos_fallo = {qr: self.motivos_fallo[qr] for qr, _ in conservados}
+
+    def como_dict(self, top):
+        """Retorna el resumen serializable a JSON con los `top` más frecuentes."""
+        return {
+            'registros': self.registros,
+            'validos': self.validos,
+            'invalidos': self.invalidos,
+            'fallos_sin_detalle': self.fallos_sin_detalle,
+            'lineas_invalidas': self.lineas_invalidas,
+            'por_tipo': dict(self.por_tipo.most_common()),
+            'por_piso': {str(p): c for p, c in sorted(self.por_piso.items(), key=lambda x: str(x[0]))},
+            'por_nodo': dict(self.por_nodo.most_common(top)),
+            'nodos_sin_escaneos': sorted(set(self.nodos_conocidos) - set(self.por_nodo)),
+            'rutas': [
+                {'origen': o, 'destino': d, 'escaneos': c}
+                for (o, d), c in self.rutas.most_common(top)
+            ],
+            'fallos': [
+                {'qr': qr, 'escaneos': c, 'motivo': self.motivos_fallo[qr]}
+                for qr, c in self.fallos.most_common(top)
+            ],
+        }
+
+
+def analizar_registro(ruta, resumen, alias):
+    """
+    Procesa un archivo de registro en una sola pasada.
+
+    Las líneas se agrupan en lotes para validarlas con verificar_qr_lote(),
+    que reutiliza el resultado de cada contenido distinto entre lotes.
+    """
+    cache = {}
+    payloads = []
+    destinos = []
+    loads = json.loads
+
+    def vaciar_lote():
+        if len(cache) > LIMITE_CACHE:
+            cache.clear()
+        resumen.agregar_lote(payloads, destinos, verificar_qr_lote(payloads, alias, cache))
+        payloads.clear()
+        destinos.clear()
+
+    with abrir_registro(ruta) as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            resumen.registros += 1
+            try:
+                registro = loads(linea)
+                qr_data = registro.get('qr', registro.get('payload'))
+                destino = registro.get('destino')
+            except (ValueError, AttributeError):
+                resumen.lineas_invalidas += 1
+                continue
+            if not isinstance(qr_data, str) or not (destino is None or isinstance(destino, str)):
+                resumen.lineas_invalidas += 1
+                continue
+
+            payloads.append(qr_data)
+            destinos.append(destino)
+            if len(payloads) >= TAMANO_LOTE:
+                vaciar_lote()
+
+    if payloads:
+        vaciar_lote()
+
+
+def generar_registro_sintetico(ruta, cantidad, nodos_conocidos, semilla=0):
+    """
+    Genera un registro de escaneo sintético para pruebas de rendimiento.
+
+    La popularidad de los nodos sigue una distribución sesgada (pocos
+    stickers concentran la mayoría de los escaneos), con un 2% de lecturas
+    corruptas y algunos QRs de ruta.
+    """
+    rng = random.Random(semilla)
+    ids = sorted(nodos_conocidos)
+    pesos = [1 / (k + 1) for k in range(len(ids))]
+    rng.shuffle(pesos)
+
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for i in range(cantidad):
+            origen = rng.choices(ids, pesos)[0]
+            azar = rng.random()
+            if azar < 0.02:
+                qr_data = rng.choice(['nodo:P9_Inexistente', 'ruta:' + origen, '{"type": "nodo"',
+                                      'coord:abc', 'texto cualquiera'])
+            elif azar < 0.10:
+                qr_data = f"ruta:{origen}|{rng.choice(ids)}"
+            elif azar < 0.55:
+                qr_data = crear_datos_qr({'id': origen, 'x': 0, 'y': 0}, nodos_conocidos[origen])
+            else:
+                qr_data = f"nodo:{origen}"
+
+            registro = {'ts': f"2025-12-01T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}",
+                        'qr': qr_data}
+            if rng.random() < 0.6:
+                registro['destino'] = rng.choices(ids, pesos)[0]
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    print(f"📄 Registro sintético de {cantidad:,} líneas creado: {ruta}")
+
+
+def imprimir_resumen(datos):
+    """Imprime las tablas de resumen."""
+    print("\n" + "=" * 70)
+    print("📊 RESUMEN DE ESCANEOS")
+    print("=" * 70)
+    print(f"  Registros:        {datos['registros']:>12,}")
+    print(f"  QRs válidos:      {datos['validos']:>12,}")
+    print(f"  QRs inválidos:    {datos['invalidos']:>12,}")
+    print(f"  Líneas ilegibles: {datos['lineas_invalidas']:>12,}")
+    if datos['fallos_sin_detalle']:
+        print(f"  (fallos fuera del detalle por límite de memoria: {datos['fallos_sin_detalle']:,})")
+
+    print("\n📍 Por piso")
+    print("─" * 70)
+    for piso, cantidad in datos['por_piso'].items():
+        print(f"  Piso {piso:<6}{cantidad:>12,}")
+
+    print("\n🏷️  Stickers más escaneados")
+    print("─" * 70)
+    for nodo_id, cantidad in datos['por_nodo'].items():
+        print(f"  {nodo_id:<50}{cantidad:>12,}")
+
+    if datos['nodos_sin_escaneos']:
+        print(f"\n💤 Nodos sin escaneos: {len(datos['nodos_sin_escaneos'])}")
+        print("   " + ", ".join(datos['nodos_sin_escaneos'][:10])
+              + (" ..." if len(datos['nodos_sin_escaneos']) > 10 else ""))
+
+    print("\n🧭 Pares origen → destino más usados")
+    print("─" * 70)
+    for ruta in datos['rutas']:
+        par = f"{ruta['origen']} → {ruta['destino']}"
+        print(f"  {par:<58}{ruta['escaneos']:>10,}")
+
+    print("\n❌ Contenidos que fallan la validación")
+    print("─" * 70)
+    for fallo in datos['fallos']:
+        print(f"  {fallo['escaneos']:>10,}  {fallo['qr'][:30]:<32}{fallo['motivo'][:40]}")
+    print("=" * 70)
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Analiza registros de escaneo QR (JSONL)')
+    parser.add_argument('registros', nargs='+', help='Archivos .jsonl o .jsonl.gz')
+    parser.add_argument('--top', type=int, default=15, help='Filas por tabla (default: 15)')
+    parser.add_argument('--salida', help='Ruta opcional para guardar el resumen en JSON')
+    parser.add_argument('--sintetico', type=int, metavar='N',
+                        help='Genera un registro sintético de N líneas en la ruta indicada')
+    args = parser.parse_args()
+
+    directorio_base = Path(__file__).parent.parent
+    try:
+        nodos_conocidos = cargar_nodos_conocidos(directorio_base)
+    except json.JSONDecodeError as e:
+        print(f"❌ Error al leer los grafos: {e}")
+        return 1
+    alias = leer_alias_dart(str(directorio_base / RUTA_ALIAS_DART))
+
+    if args.sintetico:
+        generar_registro_sintetico(args.registros[0], args.sintetico, nodos_conocidos)
+        return 0
+
+    resumen = ResumenEscaneos(nodos_conocidos)
+    inicio = time.perf_counter()
+    for ruta in args.registros:
+        if not Path(ruta).exists():
+            print(f"❌ Archivo no encontrado: {ruta}")
+            return 1
+        analizar_registro(ruta, resumen, alias)
+    duracion = time.perf_counter() - inicio
+
+    datos = resumen.como_dict(args.top)
+    imprimir_resumen(datos)
+
+    por_minuto = resumen.registros / duracion * 60 if duracion > 0 else 0
+    print(f"⏱️  {resumen.registros:,} registros en {duracion:.2f}s "
+          f"({por_minuto / 1e6:.1f} millones/min)")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2)
+        print(f"📄 Resumen guardado en: {args.salida}")
+
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Robustez de Escaneo QR
+Sistema de Navegación Interior - UMAG
+
+Este script mide qué tan bien se leen los códigos QR bajo condiciones reales
+de uso (sticker de 3x3 cm visto por la cámara de un teléfono) para elegir el
+nivel de corrección de errores y el formato de datos más livianos que todavía
+escanean de forma confiable.
+
+Para cada nivel de corrección (L, M, Q, H) y cada perfil de datos se generan
+los QRs de los nodos reales del grafo, se degradan con NumPy (reducción a
+resolución de cámara, desenfoque, perspectiva, reflejo y oclusión parcial)
+y se decodifican localmente con OpenCV, midiendo tasa de éxito y tiempo.
+El decodificador de OpenCV es más exigente que el del teléfono, por lo que
+los resultados son conservadores: sirven para comparar configuraciones.
+
+Cada fila se calibra con la variante 'limpio' (sin degradación): si no se
+lee el 100% de los QRs limpios, la fila mide el límite de píxeles por módulo
+del decodificador y no el nivel de corrección, así que se marca como no
+comparable.
+
+Uso:
+    python benchmark_qr.py [--pisos 1 2] [--repeticiones 5] [--csv salida.csv]
+
+Requiere:
+    pip install numpy opencv-python-headless
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import os
+import time
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+import numpy as np
+import qrcode
+
+# Importar funciones compartidas y la configuración del script principal
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import crear_datos_qr, leer_grafo_json
+from generar_qrs import QR_CONFIG
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Niveles de corrección a comparar (de menor a mayor densidad)
+NIVELES_CORRECCION = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+
+# Perfiles de datos: cómo se arma el contenido del QR a partir de un nodo.
+# Todos son formatos aceptados por QRUtils.parseQRCode() en codigo_qr.dart.
+PERFILES_DATOS = {
+    'json_completo': lambda nodo, piso: crear_datos_qr(nodo, piso),
+    'json_sin_coord': lambda nodo, piso: json.dumps(
+        {"type": "nodo", "id": nodo.get('id', ''), "piso": piso}, ensure_ascii=False
+    ),
+    'texto_nodo': lambda nodo, piso: f"nodo:{nodo.get('id', '')}",
+}
+
+# Escenarios de cámara: (nombre, ancho del frame en px, distancia al sticker en cm)
+ESCENARIOS_CAMARA = [
+    ('1080p_15cm', 1920, 15),  # Escaneo de cerca: todas las versiones superan ~5 px/módulo
+    ('1080p_25cm', 1920, 25),
+    ('1080p_40cm', 1920, 40),
+    ('720p_30cm', 1280, 30),
+]
+
+TAMANO_STICKER_CM = 3.0
+CAMPO_VISION_GRADOS = 65.0  # Campo de visión horizontal típico de un teléfono
+BOX_SIZE_RENDER = 8  # Resolución del "sticker físico" antes de fotografiarlo
+
+
+def pixeles_sticker(ancho_frame_px, distancia_cm):
+    """
+    Calcula cuántos píxeles ocupa el sticker en el frame de la cámara.
+
+    Args:
+        ancho_frame_px (int): Ancho del frame de la cámara en píxeles
+        distancia_cm (float): Distancia entre la cámara y el sticker
+
+    Returns:
+        int: Lado del sticker en píxeles de cámara
+    """
+    ancho_visible_cm = 2 * distancia_cm * math.tan(math.radians(CAMPO_VISION_GRADOS / 2))
+    return max(1, int(round(ancho_frame_px * TAMANO_STICKER_CM / ancho_visible_cm)))
+
+
+def pixeles_por_modulo(lado_px, version):
+    """Píxeles de cámara por módulo del QR (incluye el borde en el lado)."""
+    return lado_px / (17 + 4 * version + 2 * QR_CONFIG['border'])
+
+
+def crear_detector():
+    """
+    Crea el detector de OpenCV.
+
+    QRCodeDetectorAruco (OpenCV ≥ 4.8) localiza los patrones de forma más
+    estable que el detector clásico, que falla de forma intermitente incluso
+    con QRs limpios.
+    """
+    if hasattr(cv2, 'QRCodeDetectorAruco'):
+        return cv2.QRCodeDetectorAruco()
+    return cv2.QRCodeDetector()
+
+
+def renderizar_qr(datos, nivel):
+    """
+    Genera la matriz de un QR y la renderiza como imagen en escala de grises.
+
+    Args:
+        datos (str): Contenido del QR
+        nivel (int): Constante de corrección de errores de qrcode
+
+    Returns:
+        tuple: (imagen float32 con valores 0-255, versión del QR)
+    """
+    qr = qrcode.QRCode(**{**QR_CONFIG, 'error_correction': nivel})
+    qr.add_data(datos)
+    qr.make(fit=True)
+
+    matriz = np.array(qr.get_matrix(), dtype=bool)
+    modulos = np.where(matriz, 0.0, 255.0).astype(np.float32)
+    imagen = np.kron(modulos, np.ones((BOX_SIZE_RENDER, BOX_SIZE_RENDER), dtype=np.float32))
+    return imagen, qr.version
+
+
+# ==================== DEGRADACIONES (NumPy) ====================
+
+def muestrear_bilineal(imagen, xs, ys, fondo=255.0):
+    """
+    Muestrea una imagen en coordenadas reales con interpolación bilineal.
+
+    Las coordenadas fuera de la imagen toman el valor de fondo.
+    """
+    alto, ancho = imagen.shape
+    x0 = np.floor(xs).astype(np.int64)
+    y0 = np.floor(ys).astype(np.int64)
+    fx = (xs - x0).astype(np.float32)
+    fy = (ys - y0).astype(np.float32)
+
+    relleno = np.pad(imagen, 1, mode='constant', constant_values=fondo)
+    x0 = np.clip(x0 + 1, 0, ancho + 1)
+    y0 = np.clip(y0 + 1, 0, alto + 1)
+    x1 = np.clip(x0 + 1, 0, ancho + 1)
+    y1 = np.clip(y0 + 1, 0, alto + 1)
+
+    arriba = relleno[y0, x0] * (1 - fx) + relleno[y0, x1] * fx
+    abajo = relleno[y1, x0] * (1 - fx) + relleno[y1, x1] * fx
+    return arriba * (1 - fy) + abajo * fy
+
+
+def reducir_a_camara(imagen, lado_px):
+    """
+    Reduce el sticker a la resolución con que lo ve la cámara.
+
+    Promedia por área (suaviza antes de muestrear) para imitar el sensor.
+    """
+    factor = imagen.shape[0] / lado_px
+    if factor > 1:
+        imagen = desenfocar(imagen, sigma=factor / 2)
+    centros = (np.arange(lado_px, dtype=np.float32) + 0.5) * factor - 0.5
+    xs, ys = np.meshgrid(centros, centros)
+    return muestrear_bilineal(imagen, xs, ys)
+
+
+def desenfocar(imagen, sigma):
+    """Aplica un desenfoque gaussiano separable."""
+    if sigma <= 0:
+        return imagen
+    radio = max(1, int(math.ceil(3 * sigma)))
+    offsets = np.arange(-radio, radio + 1, dtype=np.float32)
+    kernel = np.exp(-(offsets ** 2) / (2 * sigma ** 2))
+    kernel /= kernel.sum()
+
+    alto, ancho = imagen.shape
+    relleno = np.pad(imagen, ((0, 0), (radio, radio)), mode='edge')
+    horizontal = sum(k * relleno[:, i:i + ancho] for i, k in enumerate(kernel))
+    relleno = np.pad(horizontal, ((radio, radio), (0, 0)), mode='edge')
+    return sum(k * relleno[i:i + alto, :] for i, k in enumerate(kernel))
+
+
+def inclinar_perspectiva(imagen, inclinacion, rng):
+    """
+    Aplica una deformación de perspectiva desplazando las esquinas.
+
+    Args:
+        imagen (ndarray): Imagen en escala de grises
+        inclinacion (float): Desplazamiento máximo de cada esquina (fracción del lado)
+        rng (Generator): Generador aleatorio de NumPy
+    """
+    alto, ancho = imagen.shape
+    origen = np.array([[0, 0], [ancho, 0], [ancho, alto], [0, alto]], dtype=np.float64)
+    destino = origen + rng.uniform(-inclinacion, inclinacion, size=(4, 2)) * [ancho, alto]
+
+    # Homografía inversa: para cada píxel de salida, de dónde viene en el sticker
+    filas = []
+    valores = []
+    for (xd, yd), (xo, yo) in zip(destino, origen):
+        filas.append([xd, yd, 1, 0, 0, 0, -xo * xd, -xo * yd])
+        filas.append([0, 0, 0, xd, yd, 1, -yo * xd, -yo * yd])
+        valores.extend([xo, yo])
+    h = np.append(np.linalg.solve(np.array(filas), np.array(valores)), 1.0).reshape(3, 3)
+
+    ys, xs = np.mgrid[0:alto, 0:ancho].astype(np.float64)
+    w = h[2, 0] * xs + h[2, 1] * ys + h[2, 2]
+    xo = (h[0, 0] * xs + h[0, 1] * ys + h[0, 2]) / w
+    yo = (h[1, 0] * xs + h[1, 1] * ys + h[1, 2]) / w
+    return muestrear_bilineal(imagen, xo, yo).astype(np.float32)
+
+
+def agregar_reflejo(imagen, intensidad, rng):
+    """Agrega un brillo gaussiano (luz reflejada en el plástico del sticker)."""
+    alto, ancho = imagen.shape
+    cx, cy = rng.uniform(0.2, 0.8) * ancho, rng.uniform(0.2, 0.8) * alto
+    sigma = 0.2 * min(alto, ancho)
+    ys, xs = np.ogrid[0:alto, 0:ancho]
+    brillo = intensidad * 255.0 * np.exp(-((xs - cx) ** 2 + (ys - cy) ** 2) / (2 * sigma ** 2))
+    return np.minimum(imagen + brillo, 255.0).astype(np.float32)
+
+
+def ocluir(imagen, fraccion, rng):
+    """Tapa un rectángulo que cubre la fracción indicada del área del QR."""
+    alto, ancho = imagen.shape
+    lado_y = int(alto * math.sqrt(fraccion))
+    lado_x = int(ancho * math.sqrt(fraccion))
+    y = rng.integers(0, alto - lado_y + 1)
+    x = rng.integers(0, ancho - lado_x + 1)
+    resultado = imagen.copy()
+    resultado[y:y + lado_y, x:x + lado_x] = rng.choice([0.0, 255.0])
+    return resultado
+
+
+# Variantes evaluadas: (nombre, degradación física, sigma de desenfoque en px de cámara)
+VARIANTES = [
+    ('limpio', lambda img, rng: img, 0.0),
+    ('desenfoque', lambda img, rng: img, 1.2),
+    ('perspectiva', lambda img, rng: inclinar_perspectiva(img, 0.08, rng), 0.0),
+    ('reflejo', lambda img, rng: agregar_reflejo(img, 0.8, rng), 0.0),
+    ('oclusion_10', lambda img, rng: ocluir(img, 0.10, rng), 0.0),
+    ('combinado', lambda img, rng: ocluir(
+        agregar_reflejo(inclinar_perspectiva(img, 0.05, rng), 0.5, rng), 0.05, rng), 0.8),
+]
+
+
+def capturar(imagen, lado_px, sigma, rng):
+    """
+    Simula la captura del sticker por la cámara del teléfono.
+
+    Returns:
+        ndarray: Frame uint8 con el sticker centrado sobre una pared gris
+    """
+    sticker = desenfocar(reducir_a_camara(imagen, lado_px), sigma)
+    margen = lado_px // 2
+    frame = np.full((lado_px + 2 * margen, lado_px + 2 * margen), 180.0, dtype=np.float32)
+    frame[margen:margen + lado_px, margen:margen + lado_px] = sticker
+    frame += rng.normal(0, 4.0, size=frame.shape)  # Ruido del sensor
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def decodificar(frame, detector):
+    """
+    Decodifica un frame y mide el tiempo de lectura.
+
+    Returns:
+        tuple: (texto decodificado o '', segundos)
+    """
+    inicio = time.perf_counter()
+    texto, _, _ = detector.detectAndDecode(frame)
+    return texto, time.perf_counter() - inicio
+
+
+def cargar_nodos(directorio_base, pisos):
+    """Lee los nodos reales de los grafos de los pisos indicados."""
+    nodos = []
+    for piso in pisos:
+        grafo = leer_grafo_json(str(Path(directorio_base) / f'lib/data/grafo_piso{piso}.json'))
+        if grafo:
+            nodos.extend((nodo, piso) for nodo in grafo.get('nodos', []))
+    return nodos
+
+
+def ejecutar_benchmark(nodos, repeticiones, semilla=0):
+    """
+    Ejecuta el benchmark completo.
+
+    Args:
+        nodos (list): Lista de tuplas (nodo, piso)
+        repeticiones (int): Variantes aleatorias por nodo y degradación
+        semilla (int): Semilla para reproducir los resultados
+
+    Returns:
+        list: Filas con los resultados agregados
+    """
+    detector = crear_detector()
+    resultados = []
+
+    for nombre_nivel, nivel in NIVELES_CORRECCION.items():
+        for nombre_perfil, perfil in PERFILES_DATOS.items():
+            renders = []
+            for nodo, piso in nodos:
+                datos = perfil(nodo, piso)
+                imagen, version = renderizar_qr(datos, nivel)
+                renders.append((datos, imagen, version))
+            version_max = max(version for _, _, version in renders)
+
+            for nombre_camara, ancho_frame, distancia in ESCENARIOS_CAMARA:
+                lado_px = pixeles_sticker(ancho_frame, distancia)
+                filas_escenario = []
+
+                for nombre_variante, degradar, sigma in VARIANTES:
+                    rng = np.random.default_rng(semilla)
+                    exitos = 0
+                    intentos = 0
+                    tiempos = []
+                    tiempos_exito = []
+
+                    for datos, imagen, _ in renders:
+                        for _ in range(repeticiones):
+                            frame = capturar(degradar(imagen, rng), lado_px, sigma, rng)
+                            texto, segundos = decodificar(frame, detector)
+                            intentos += 1
+                            tiempos.append(segundos)
+                            if texto == datos:
+                                exitos += 1
+                                tiempos_exito.append(segundos)
+
+                    filas_escenario.append({
+                        'nivel': nombre_nivel,
+                        'perfil': nombre_perfil,
+                        'version_max': version_max,
+                        'camara': nombre_camara,
+                        'px_sticker': lado_px,
+                        'px_modulo': round(pixeles_por_modulo(lado_px, version_max), 1),
+                        'variante': nombre_variante,
+                        'exito_pct': 100.0 * exitos / intentos if intentos else 0.0,
+                        # Los intentos fallidos suelen abortar antes, por eso el tiempo
+                        # de referencia considera solo las lecturas correctas
+                        'tiempo_ms': (1000.0 * float(np.median(tiempos_exito))
+                                      if tiempos_exito else None),
+                        'tiempo_total_ms': 1000.0 * float(np.median(tiempos)) if tiempos else 0.0,
+                    })
+
+                # Solo es comparable si el control sin degradación se lee siempre
+                calibrado = filas_escenario[0]['exito_pct'] == 100.0
+                for fila in filas_escenario:
+                    fila['calibrado'] = calibrado
+                resultados.extend(filas_escenario)
+
+            print(f"  ✓ Nivel {nombre_nivel} · {nombre_perfil} (versión ≤ {version_max})")
+
+    return resultados
+
+
+def imprimir_tabla(resultados):
+    """Imprime una tabla de éxito (%) y tiempo mediano de lectura (ms) por variante."""
+    variantes = [nombre for nombre, _, _ in VARIANTES]
+    encabezado = f"  {'Nivel':<6}{'Perfil':<16}{'Ver':>4} {'Cámara':<12}{'px':>4}{'px/m':>6}"
+    encabezado += ''.join(f"{v[:11]:>12}" for v in variantes)
+    print(encabezado)
+    print("─" * len(encabezado))
+
+    filas = {}
+    for r in resultados:
+        clave = (r['nivel'], r['perfil'], r['version_max'], r['camara'], r['px_sticker'],
+                 r['px_modulo'], r['calibrado'])
+        filas.setdefault(clave, {})[r['variante']] = r
+
+    no_comparables = 0
+    for (nivel, perfil, version, camara, px, px_modulo, calibrado), por_variante in filas.items():
+        marca = '  ' if calibrado else '⚠ '
+        no_comparables += not calibrado
+        linea = f"{marca}{nivel:<6}{perfil:<16}{version:>4} {camara:<12}{px:>4}{px_modulo:>6.1f}"
+        for v in variantes:
+            r = por_variante[v]
+            tiempo = f"{r['tiempo_ms']:>4.1f}" if r['tiempo_ms'] is not None else f"{'—':>4}"
+            linea += f"{r['exito_pct']:>5.0f}%/{tiempo}"
+        print(linea)
+
+    print("─" * len(encabezado))
+    print("Cada celda: % de lecturas correctas / tiempo mediano de las lecturas correctas (ms)")
+    print("El CSV incluye además 'tiempo_total_ms', la mediana de todos los intentos.")
+    print("px/m: píxeles de cámara por módulo del QR de mayor versión del perfil")
+    if no_comparables:
+        print(f"⚠ {no_comparables} filas no comparables: la variante 'limpio' no llega al 100%,")
+        print("  así que miden el límite de resolución del decodificador y no la corrección")
+
+
+def guardar_csv(resultados, ruta_csv):
+    """Guarda los resultados crudos en un archivo CSV."""
+    with open(ruta_csv, 'w', encoding='utf-8', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=list(resultados[0].keys()))
+        escritor.writeheader()
+        escritor.writerows(resultados)
+    print(f"📄 Resultados guardados en: {ruta_csv}")
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Benchmark de robustez de escaneo QR')
+    parser.add_argument('--pisos', type=int, nargs='+', default=[1, 2, 3, 4],
+                        help='Pisos cuyos nodos se usan como datos (default: todos)')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Variantes aleatorias por nodo y degradación (default: 3)')
+    parser.add_argument('--semilla', type=int, default=0,
+                        help='Semilla aleatoria para resultados reproducibles')
+    parser.add_argument('--csv', help='Ruta opcional para guardar los resultados en CSV')
+    args = parser.parse_args()
+
+    if cv2 is None:
+        print("❌ Error: Se requiere OpenCV para decodificar los QRs")
+        print("   pip install opencv-python-headless")
+        return 1
+
+    directorio_base = Path(__file__).parent.parent
+    nodos = cargar_nodos(directorio_base, args.pisos)
+    if not nodos:
+        print("❌ Error: No se encontraron nodos en los grafos")
+        return 1
+
+    print("\n" + "=" * 70)
+    print("🔬 BENCHMARK DE ROBUSTEZ QR")
+    print("=" * 70)
+    print(f"📍 Nodos: {len(nodos)} · Repeticiones: {args.repeticiones}")
+    for nombre, ancho, distancia in ESCENARIOS_CAMARA:
+        print(f"📷 {nombre}: sticker de {TAMANO_STICKER_CM:.0f} cm ≈ "
+              f"{pixeles_sticker(ancho, distancia)} px")
+    print("─" * 70)
+
+    resultados = ejecutar_benchmark(nodos, args.repeticiones, args.semilla)
+
+    print("\n" + "=" * 70)
+    print("📊 RESULTADOS")
+    print("=" * 70)
+    imprimir_tabla(resultados)
+
+    if args.csv:
+        guardar_csv(resultados, args.csv)
+
+    print("\n💡 TIP: Compara solo filas sin ⚠. Elige el nivel más bajo cuyo éxito")
+    print("   se mantenga alto en la variante 'combinado' para la cámara más exigente")
+    print("   que siga calibrada.\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
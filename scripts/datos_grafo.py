@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lectura de Grafos y Datos de QR
+Sistema de Navegación Interior - UMAG
+
+Funciones compartidas por los scripts para leer los archivos grafo_pisoN.json
+y construir el contenido de los QRs, además de la tabla de alias de la app.
+Solo usa la biblioteca estándar, de modo que los scripts que no dibujan QRs
+(verificación, análisis, índices, parches) no necesitan qrcode ni Pillow.
+"""
+
+import json
+import re
+
+RUTA_ALIAS_DART = 'lib/utils/codigo_qr.dart'
+
+# Entradas del mapa aliasUbicaciones: 'Entrada Principal': 'P1_Entrada_1',
+PATRON_ALIAS = re.compile(r"'([^']+)'\s*:\s*'([^']+)'")
+
+def leer_grafo_json(ruta_json):
+    """
+    Lee y valida un archivo JSON de grafo.
+    
+    Args:
+        ruta_json (str): Ruta al archivo JSON
+        
+    Returns:
+        dict: Datos del grafo o None si hay error
+    """
+    try:
+        with open(ruta_json, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        if 'nodos' not in data:
+            print(f"⚠️  El archivo no contiene la clave 'nodos': {ruta_json}")
+            return None
+            
+        return data
+    except FileNotFoundError:
+        print(f"❌ Archivo no encontrado: {ruta_json}")
+        return None
+    except json.JSONDecodeError as e:
+        print(f"❌ Error al decodificar JSON: {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error inesperado al leer {ruta_json}: {e}")
+        return None
+
+# Tamaño de bloque para la lectura incremental de grafos grandes
+TAMANO_BLOQUE_LECTURA = 64 * 1024
+
+_DECODIFICADOR_JSON = json.JSONDecoder()
+_ESPACIOS = ' \t\n\r'
+_PATRON_ESTRUCTURA = re.compile(r'["\[\]{}]')
+_PATRON_FIN_STRING = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+# Resto del buffer que todavía podría ser parte de un número (ej: "0." o "1e")
+_PATRON_RESTO_NUMERO = re.compile(r'[0-9.eE+-]*\Z')
+
+class _LectorIncremental:
+    """
+    Buffer de lectura por bloques sobre un archivo de texto.
+
+    Mantiene solo la porción aún no consumida, de modo que la memoria
+    depende del tamaño del elemento más grande y no del archivo.
+    """
+
+    def __init__(self, archivo, tamano_bloque):
+        self.archivo = archivo
+        self.tamano_bloque = tamano_bloque
+        self.buffer = ''
+        self.pos = 0
+        self.fin_archivo = False
+
+    def cargar(self):
+        """Lee un bloque más. Retorna False si el archivo terminó."""
+        if self.fin_archivo:
+            return False
+        bloque = self.archivo.read(self.tamano_bloque)
+        if not bloque:
+            self.fin_archivo = True
+            return False
+        self.buffer = self.buffer[self.pos:] + bloque
+        self.pos = 0
+        return True
+
+    def siguiente_caracter(self):
+        """Salta espacios y retorna el siguiente carácter sin consumirlo."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _ESPACIOS:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.cargar():
+                raise json.JSONDecodeError("Fin de archivo inesperado", self.buffer, self.pos)
+
+    def esperar(self, caracter):
+        """Consume el carácter indicado o lanza un error de formato."""
+        if self.siguiente_caracter() != caracter:
+            raise json.JSONDecodeError(f"Se esperaba '{caracter}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def decodificar_valor(self):
+        """Decodifica un valor JSON completo, leyendo más bloques si hace falta."""
+        self.siguiente_caracter()
+        while True:
+            try:
+                valor, fin = _DECODIFICADOR_JSON.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.cargar():
+                    raise
+                continue
+            # Un número cortado por el bloque (ej: "0." + "25") se decodifica
+            # como su parte inicial: seguir leyendo hasta ver dónde termina
+            if (not self.fin_archivo and _PATRON_RESTO_NUMERO.match(self.buffer, fin)
+                    and self.cargar()):
+                continue
+            self.pos = fin
+            return valor
+
+    def saltar_valor(self):
+        """Consume un valor JSON sin construir objetos ni listas en memoria."""
+        if self.siguiente_caracter() not in '[{':
+            # Strings y literales son pequeños: se decodifican y descartan
+            self.decodificar_valor()
+            return
+        
+        profundidad = 0
+        en_string = False
+        while True:
+            if en_string:
+                m = _PATRON_FIN_STRING.match(self.buffer, self.pos)
+                if m is None:
+                    if not self.cargar():
+                        raise json.JSONDecodeError("String sin cerrar", self.buffer, self.pos)
+                    continue
+                self.pos = m.end()
+                en_string = False
+                continue
+            
+            m = _PATRON_ESTRUCTURA.search(self.buffer, self.pos)
+            if m is None:
+                self.pos = len(self.buffer)
+                if not self.cargar():
+                    raise json.JSONDecodeError("Fin de archivo inesperado", self.buffer, self.pos)
+                continue
+            
+            c = m.group()
+            self.pos = m.end()
+            if c == '"':
+                en_string = True
+            elif c in '[{':
+                profundidad += 1
+            else:
+                profundidad -= 1
+                if profundidad == 0:
+                    return
+
+def iterar_nodos_json(ruta_json, tamano_bloque=TAMANO_BLOQUE_LECTURA):
+    """
+    Lee los nodos de un archivo JSON de grafo de forma incremental.
+    
+    A diferencia de leer_grafo_json(), no carga el archivo completo: entrega
+    cada elemento de 'nodos' apenas se termina de leer y salta las demás
+    claves (por ejemplo 'conexiones') sin construirlas en memoria.
+    
+    Args:
+        ruta_json (str): Ruta al archivo JSON
+        tamano_bloque (int): Caracteres leídos por bloque
+        
+    Yields:
+        dict: Datos de cada nodo, en el orden del archivo
+        
+    Raises:
+        OSError: Si el archivo no se puede abrir
+        json.JSONDecodeError: Si el archivo está truncado o mal formado. Los
+            nodos anteriores al error ya fueron entregados, así que quien
+            consume el generador debe tratar la lectura como fallida.
+    """
+    with open(ruta_json, 'r', encoding='utf-8') as f:
+        lector = _LectorIncremental(f, tamano_bloque)
+        encontrado = False
+        lector.esperar('{')
+        
+        if lector.siguiente_caracter() != '}':
+            while True:
+                clave = lector.decodificar_valor()
+                lector.esperar(':')
+                
+                if clave == 'nodos' and not encontrado:
+                    encontrado = True
+                    lector.esperar('[')
+                    if lector.siguiente_caracter() != ']':
+                        while True:
+                            yield lector.decodificar_valor()
+                            if lector.siguiente_caracter() == ']':
+                                break
+                            lector.esperar(',')
+                    lector.esperar(']')
+                else:
+                    # El resto del documento se recorre igual, para detectar
+                    # archivos truncados después de los nodos
+                    lector.saltar_valor()
+                
+                if lector.siguiente_caracter() == '}':
+                    break
+                lector.esperar(',')
+        lector.esperar('}')
+        
+        try:
+            lector.siguiente_caracter()
+        except json.JSONDecodeError:
+            pass
+        else:
+            raise json.JSONDecodeError("Datos extra después del grafo", lector.buffer, lector.pos)
+    
+    if not encontrado:
+        print(f"⚠️  El archivo no contiene la clave 'nodos': {ruta_json}")
+
+def extraer_numero_piso(nodo_id):
+    """
+    Extrae el número de piso del ID del nodo.
+    
+    Args:
+        nodo_id (str): ID del nodo (ej: "P1_Entrada_1")
+        
+    Returns:
+        int: Número de piso o 1 por defecto
+    """
+    try:
+        # Formato esperado: "P{numero}_{resto}"
+        if '_' in nodo_id and nodo_id.startswith('P'):
+            piso_str = nodo_id.split('_')[0].replace('P', '')
+            return int(piso_str)
+    except (ValueError, IndexError):
+        pass
+    
+    return 1  # Piso por defecto
+
+def crear_datos_qr(nodo, piso_default=1):
+    """
+    Crea los datos del QR en el formato esperado por la aplicación.
+    
+    Args:
+        nodo (dict): Datos del nodo
+        piso_default (int): Número de piso por defecto
+        
+    Returns:
+        str: JSON string con los datos del QR
+    """
+    nodo_id = nodo.get('id', '')
+    piso = extraer_numero_piso(nodo_id) if nodo_id else piso_default
+    
+    # Formato compatible con codigo_qr.dart
+    qr_data = {
+        "type": "nodo",
+        "id": nodo_id,
+        "piso": piso,
+        "x": nodo.get('x'),
+        "y": nodo.get('y')
+    }
+    
+    return json.dumps(qr_data, ensure_ascii=False)
+
+def etapa_payloads(nodos, numero_piso):
+    """
+    Construye los datos del QR de cada nodo.
+    
+    Yields:
+        tuple: (nodo_id, datos_qr)
+    """
+    for i, nodo in enumerate(nodos, 1):
+        nodo_id = nodo.get('id', f'nodo_{i}')
+        yield nodo_id, crear_datos_qr(nodo, numero_piso)
+
+def leer_alias_dart(ruta_dart):
+    """
+    Lee la tabla QRUtils.aliasUbicaciones desde el código fuente de la app.
+
+    Args:
+        ruta_dart (str): Ruta a codigo_qr.dart
+
+    Returns:
+        dict: Alias -> ID de nodo (vacío si no se encuentra)
+    """
+    try:
+        with open(ruta_dart, 'r', encoding='utf-8') as f:
+            contenido = f.read()
+    except FileNotFoundError:
+        print(f"⚠️  Archivo de alias no encontrado: {ruta_dart}")
+        return {}
+
+    inicio = contenido.find('aliasUbicaciones')
+    if inicio < 0:
+        print(f"⚠️  No se encontró aliasUbicaciones en {ruta_dart}")
+        return {}
+    fin = contenido.find('};', inicio)
+    return dict(PATRON_ALIAS.findall(contenido[inicio:fin]))
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parches Incrementales para los Grafos de Piso
+Sistema de Navegación Interior - UMAG
+
+Este script compara dos versiones de los archivos grafo_pisoN.json y genera
+un parche pequeño con los cambios, para actualizar la app sin enviar los
+grafos completos. También aplica un parche sobre la versión anterior y
+verifica por hash que el resultado sea idéntico a la versión nueva.
+
+El parche contiene, por archivo:
+- Nodos agregados, eliminados y modificados (comparados por 'id')
+- Conexiones agregadas, eliminadas y modificadas (comparadas por origen→destino)
+- Los IDs cuyo código QR debe regenerarse o retirarse
+Un archivo que ya no existe en la versión nueva se marca como 'eliminado'.
+
+Uso:
+    python delta_grafo.py generar grafo_viejo.json grafo_nuevo.json -o parche.json
+    python delta_grafo.py generar datos_viejos/ lib/data/ -o parche.json
+    python delta_grafo.py aplicar grafo_viejo.json parche.json -o grafo_nuevo.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import sys
+import os
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+# Importar funciones compartidas de lectura de grafos
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import crear_datos_qr, leer_grafo_json
+
+FORMATO_PARCHE = 'delta_grafo'
+VERSION_PARCHE = 1
+
+# Nombres de archivo aceptados en un parche de carpeta (mismo patrón que listar_grafos)
+PATRON_NOMBRE_GRAFO = re.compile(r'grafo_piso[^/\\]*\.json')
+
+
+def hash_grafo(grafo):
+    """
+    Calcula el hash SHA-256 de la forma canónica de un grafo.
+
+    La forma canónica no depende del orden de nodos y conexiones en el
+    archivo ni del formato de espacios, solo de su contenido.
+    """
+    canonico = dict(grafo)
+    canonico['nodos'] = sorted(grafo.get('nodos', []), key=lambda n: str(n.get('id')))
+    canonico['conexiones'] = sorted(
+        grafo.get('conexiones', []),
+        key=lambda c: (str(c.get('origen')), str(c.get('destino')),
+                       json.dumps(c, sort_keys=True, ensure_ascii=False)))
+    texto = json.dumps(canonico, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def indexar_nodos(nodos):
+    """Indexa los nodos por ID, verificando que no haya duplicados."""
+    indice = {}
+    for nodo in nodos:
+        nodo_id = nodo.get('id')
+        if nodo_id in indice:
+            raise ValueError(f"ID de nodo duplicado: {nodo_id}")
+        indice[nodo_id] = nodo
+    return indice
+
+
+def agrupar_conexiones(conexiones):
+    """
+    Agrupa las conexiones por (origen, destino), conservando el orden.
+
+    Un mismo par puede aparecer más de una vez en el archivo, por eso cada
+    clave guarda la lista completa de conexiones con ese origen y destino.
+    """
+    grupos = {}
+    for conexion in conexiones:
+        clave = (conexion.get('origen'), conexion.get('destino'))
+        grupos.setdefault(clave, []).append(conexion)
+    return grupos
+
+
+def numero_piso_archivo(nombre_archivo):
+    """Extrae el número de piso de "grafo_pisoN.json" (1 por defecto)."""
+    try:
+        return int(Path(nombre_archivo).stem.split('piso')[1])
+    except (ValueError, IndexError):
+        return 1
+
+
+def calcular_delta(viejo, nuevo, numero_piso=1):
+    """
+    Calcula el delta entre dos versiones de un grafo.
+
+    Recorre cada versión una sola vez indexando por clave, por lo que el
+    costo es lineal en el tamaño de los grafos.
+
+    Args:
+        viejo (dict): Grafo anterior
+        nuevo (dict): Grafo nuevo
+        numero_piso (int): Piso del grafo (para calcular los datos de los QRs)
+
+    Returns:
+        dict: Delta serializable a JSON
+    """
+    nodos_viejos = indexar_nodos(viejo.get('nodos', []))
+    nodos_nuevos = indexar_nodos(nuevo.get('nodos', []))
+
+    nodos = {'agregados': [], 'eliminados': [], 'modificados': []}
+    qr_afectados = []
+    for nodo_id, nodo in nodos_nuevos.items():
+        anterior = nodos_viejos.get(nodo_id)
+        if anterior is None:
+            nodos['agregados'].append(nodo)
+            qr_afectados.append(nodo_id)
+        elif anterior != nodo:
+            nodos['modificados'].append(nodo)
+            if crear_datos_qr(anterior, numero_piso) != crear_datos_qr(nodo, numero_piso):
+                qr_afectados.append(nodo_id)
+    for nodo_id in nodos_viejos:
+        if nodo_id not in nodos_nuevos:
+            nodos['eliminados'].append(nodo_id)
+            qr_afectados.append(nodo_id)
+
+    grupos_viejos = agrupar_conexiones(viejo.get('conexiones', []))
+    grupos_nuevos = agrupar_conexiones(nuevo.get('conexiones', []))
+
+    conexiones = {'agregadas': [], 'eliminadas': [], 'modificadas': []}
+    for clave, grupo in grupos_nuevos.items():
+        anterior = grupos_viejos.get(clave)
+        if anterior is None:
+            conexiones['agregadas'].extend(grupo)
+        elif anterior != grupo:
+            conexiones['modificadas'].append(
+                {'origen': clave[0], 'destino': clave[1], 'conexiones': grupo})
+    for clave in grupos_viejos:
+        if clave not in grupos_nuevos:
+            conexiones['eliminadas'].append([clave[0], clave[1]])
+
+    # Otras claves del archivo además de nodos y conexiones
+    otras = {}
+    for clave in set(viejo) | set(nuevo):
+        if clave in ('nodos', 'conexiones') or viejo.get(clave) == nuevo.get(clave):
+            continue
+        otras[clave] = nuevo.get(clave)
+    eliminadas = sorted(k for k in viejo if k not in nuevo and k not in ('nodos', 'conexiones'))
+
+    delta = {
+        'hash_base': hash_grafo(viejo),
+        'hash_resultado': hash_grafo(nuevo),
+        'nodos': {k: v for k, v in nodos.items() if v},
+        'conexiones': {k: v for k, v in conexiones.items() if v},
+        'qr_afectados': sorted(qr_afectados),
+    }
+    if otras or eliminadas:
+        delta['otras_claves'] = {'cambiadas': {k: v for k, v in otras.items() if k in nuevo},
+                                 'eliminadas': eliminadas}
+    return delta
+
+
+def aplicar_delta(viejo, delta):
+    """
+    Reconstruye el grafo nuevo a partir del anterior y un delta.
+
+    Los nodos y conexiones conservados mantienen su orden; los agregados
+    se ubican al final.
+
+    Args:
+        viejo (dict): Grafo anterior
+        delta (dict): Delta generado por calcular_delta()
+
+    Returns:
+        dict: Grafo reconstruido
+
+    Raises:
+        ValueError: Si el grafo base o el resultado no coinciden con los hashes del delta
+    """
+    if hash_grafo(viejo) != delta['hash_base']:
+        raise ValueError("El parche no corresponde a esta versión del grafo")
+
+    cambios_nodos = delta.get('nodos', {})
+    eliminados = set(cambios_nodos.get('eliminados', []))
+    modificados = {n['id']: n for n in cambios_nodos.get('modificados', [])}
+    nodos = [modificados.get(n.get('id'), n) for n in viejo.get('nodos', [])
+             if n.get('id') not in eliminados]
+    nodos.extend(cambios_nodos.get('agregados', []))
+
+    cambios_conexiones = delta.get('conexiones', {})
+    eliminadas = {tuple(clave) for clave in cambios_conexiones.get('eliminadas', [])}
+    modificadas = {(g['origen'], g['destino']): g['conexiones']
+                   for g in cambios_conexiones.get('modificadas', [])}
+    conexiones = []
+    vistas = set()
+    for conexion in viejo.get('conexiones', []):
+        clave = (conexion.get('origen'), conexion.get('destino'))
+        if clave in eliminadas:
+            continue
+        if clave in modificadas:
+            # El grupo completo reemplaza todas las apariciones del par
+            if clave not in vistas:
+                conexiones.extend(modificadas[clave])
+                vistas.add(clave)
+            continue
+        conexiones.append(conexion)
+    conexiones.extend(cambios_conexiones.get('agregadas', []))
+
+    nuevo = {}
+    otras = delta.get('otras_claves', {})
+    for clave, valor in viejo.items():
+        if clave not in otras.get('eliminadas', []):
+            nuevo[clave] = valor
+    nuevo.update(otras.get('cambiadas', {}))
+    nuevo['nodos'] = nodos
+    nuevo['conexiones'] = conexiones
+
+    if hash_grafo(nuevo) != delta['hash_resultado']:
+        raise ValueError("El hash del grafo reconstruido no coincide con el del parche")
+    return nuevo
+
+
+def listar_grafos(ruta):
+    """Retorna {nombre de archivo: ruta} para un archivo o una carpeta de grafos."""
+    ruta = Path(ruta)
+    if ruta.is_dir():
+        return {p.name: p for p in sorted(ruta.glob('grafo_piso*.json'))}
+    return {ruta.name: ruta}
+
+
+def nombre_archivo_valido(nombre, un_archivo=False):
+    """
+    Verifica que un nombre del parche sea un nombre de archivo simple.
+
+    Con carpetas solo se aceptan grafo_piso*.json; con un archivo suelto el
+    nombre se ignora al aplicar, pero igual debe ser un nombre sin rutas.
+    """
+    if not isinstance(nombre, str) or nombre in ('', '.', '..'):
+        return False
+    if '/' in nombre or '\\' in nombre or Path(nombre).name != nombre:
+        return False
+    return un_archivo or PATRON_NOMBRE_GRAFO.fullmatch(nombre) is not None
+
+
+def generar_parche(ruta_vieja, ruta_nueva):
+    """
+    Genera el parche entre dos archivos o dos carpetas de grafos.
+
+    Returns:
+        dict: Parche con un delta por archivo modificado, o None si hubo errores
+    """
+    viejos = listar_grafos(ruta_vieja)
+    nuevos = listar_grafos(ruta_nueva)
+    if Path(ruta_vieja).is_file() and Path(ruta_nueva).is_file():
+        # Comparar dos archivos sueltos aunque tengan nombres distintos
+        nuevos = {next(iter(viejos)): Path(ruta_nueva)}
+
+    parche = {'formato': FORMATO_PARCHE, 'version': VERSION_PARCHE, 'archivos': {}}
+    for nombre in sorted(set(viejos) | set(nuevos)):
+        viejo = leer_grafo_json(str(viejos[nombre])) if nombre in viejos else {'nodos': []}
+        if viejo is None:
+            return None
+        viejo.setdefault('conexiones', [])
+
+        if nombre not in nuevos:
+            # El archivo ya no existe en la versión nueva: todos sus QRs se retiran
+            parche['archivos'][nombre] = {
+                'hash_base': hash_grafo(viejo),
+                'eliminado': True,
+                'qr_afectados': sorted(indexar_nodos(viejo.get('nodos', []))),
+            }
+            continue
+
+        nuevo = leer_grafo_json(str(nuevos[nombre]))
+        if nuevo is None:
+            return None
+        nuevo.setdefault('conexiones', [])
+
+        delta = calcular_delta(viejo, nuevo, numero_piso_archivo(nombre))
+        if delta['hash_base'] != delta['hash_resultado']:
+            parche['archivos'][nombre] = delta
+    return parche
+
+
+def aplicar_parche(ruta_vieja, parche, ruta_salida):
+    """
+    Aplica un parche y guarda los grafos reconstruidos.
+
+    La salida queda igual a la versión nueva: los grafos sin cambios se
+    copian y los eliminados por el parche no se escriben (y se borran si ya
+    existían en la salida).
+
+    Returns:
+        int: Cantidad de archivos actualizados, o -1 si hubo errores
+    """
+    if (not isinstance(parche, dict) or parche.get('formato') != FORMATO_PARCHE
+            or parche.get('version') != VERSION_PARCHE):
+        formato = parche.get('formato') if isinstance(parche, dict) else None
+        version = parche.get('version') if isinstance(parche, dict) else None
+        print(f"❌ Formato de parche no soportado: {formato} v{version}")
+        return -1
+
+    viejos = listar_grafos(ruta_vieja)
+    archivos = parche.get('archivos')
+    if not isinstance(archivos, dict):
+        print("❌ Parche mal formado: falta 'archivos'")
+        return -1
+    un_archivo = Path(ruta_vieja).is_file()
+    for nombre in archivos:
+        # Los nombres vienen del parche: nunca deben salir de la carpeta de salida
+        if not nombre_archivo_valido(nombre, un_archivo):
+            print(f"❌ Nombre de archivo no permitido en el parche: {nombre!r}")
+            return -1
+    if un_archivo:
+        if len(archivos) > 1:
+            print("❌ El parche incluye varios archivos; indica una carpeta de grafos")
+            return -1
+        archivos = {next(iter(viejos)): d for d in archivos.values()}
+
+    resultados = {}
+    for nombre, delta in archivos.items():
+        viejo = leer_grafo_json(str(viejos[nombre])) if nombre in viejos else {'nodos': []}
+        if viejo is None:
+            return -1
+        viejo.setdefault('conexiones', [])
+        try:
+            if delta.get('eliminado'):
+                if hash_grafo(viejo) != delta['hash_base']:
+                    raise ValueError("El parche no corresponde a esta versión del grafo")
+                resultados[nombre] = None
+            else:
+                resultados[nombre] = aplicar_delta(viejo, delta)
+        except ValueError as e:
+            print(f"❌ {nombre}: {e}")
+            return -1
+        except (KeyError, TypeError, AttributeError) as e:
+            print(f"❌ {nombre}: parche mal formado ({type(e).__name__}: {e})")
+            return -1
+
+    # Escribir solo cuando todos los archivos se verificaron correctamente
+    if un_archivo:
+        # Siempre hay salida: sin cambios en el parche, es una copia del grafo base
+        destinos = {nombre: Path(ruta_salida) for nombre in viejos}
+    else:
+        destinos = {nombre: Path(ruta_salida) / nombre for nombre in set(resultados) | set(viejos)}
+
+    for nombre, destino in sorted(destinos.items()):
+        if nombre not in resultados:
+            # Sin cambios: copiar si la salida es otra carpeta
+            if destino.resolve() != viejos[nombre].resolve():
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(viejos[nombre], destino)
+                print(f"  ✓ {destino} (sin cambios, copiado)")
+            continue
+
+        grafo = resultados[nombre]
+        if grafo is None:
+            if destino.exists():
+                destino.unlink()
+            print(f"  🗑️  {destino} (eliminado en la versión nueva)")
+            continue
+
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(grafo, f, ensure_ascii=False, indent=2)
+        print(f"  ✓ {destino} (hash verificado)")
+    return len(resultados)
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Genera y aplica parches de grafos')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    generar = subcomandos.add_parser('generar', help='Compara dos versiones y genera un parche')
+    generar.add_argument('viejo', help='Grafo o carpeta de grafos anterior')
+    generar.add_argument('nuevo', help='Grafo o carpeta de grafos nueva')
+    generar.add_argument('-o', '--salida', required=True, help='Archivo del parche')
+
+    aplicar = subcomandos.add_parser('aplicar', help='Aplica un parche sobre la versión anterior')
+    aplicar.add_argument('viejo', help='Grafo o carpeta de grafos anterior')
+    aplicar.add_argument('parche', help='Archivo del parche')
+    aplicar.add_argument('-o', '--salida', required=True, help='Archivo o carpeta de salida')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print("🧩 PARCHES DE GRAFOS")
+    print("=" * 70)
+
+    if args.comando == 'generar':
+        for ruta in (args.viejo, args.nuevo):
+            if not Path(ruta).exists():
+                print(f"❌ Archivo no encontrado: {ruta}")
+                return 1
+        try:
+            parche = generar_parche(args.viejo, args.nuevo)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        if parche is None:
+            return 1
+
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(parche, f, ensure_ascii=False, separators=(',', ':'))
+
+        tamano_completo = sum(p.stat().st_size for p in listar_grafos(args.nuevo).values())
+        tamano_parche = Path(args.salida).stat().st_size
+        for nombre, delta in parche['archivos'].items():
+            if delta.get('eliminado'):
+                print(f"  {nombre}: eliminado en la versión nueva · "
+                      f"QRs afectados: {len(delta['qr_afectados'])}")
+                continue
+            nodos = delta['nodos']
+            conexiones = delta['conexiones']
+            print(f"  {nombre}: nodos +{len(nodos.get('agregados', []))} "
+                  f"-{len(nodos.get('eliminados', []))} ~{len(nodos.get('modificados', []))} · "
+                  f"conexiones +{len(conexiones.get('agregadas', []))} "
+                  f"-{len(conexiones.get('eliminadas', []))} ~{len(conexiones.get('modificadas', []))} · "
+                  f"QRs afectados: {len(delta['qr_afectados'])}")
+        print("─" * 70)
+        if not parche['archivos']:
+            print("✅ Sin cambios entre las versiones")
+        print(f"📄 Parche: {args.salida} ({tamano_parche:,} bytes, "
+              f"vs {tamano_completo:,} bytes de los grafos completos)\n")
+        return 0
+
+    if not Path(args.viejo).exists() or not Path(args.parche).exists():
+        print("❌ Archivo no encontrado")
+        return 1
+    try:
+        with open(args.parche, 'r', encoding='utf-8') as f:
+            parche = json.load(f)
+    except json.JSONDecodeError as e:
+        print(f"❌ El parche no es un JSON válido: {e}")
+        return 1
+    actualizados = aplicar_parche(args.viejo, parche, args.salida)
+    if actualizados < 0:
+        return 1
+    print("─" * 70)
+    print(f"✅ Parche aplicado: {actualizados} grafo(s) actualizados o eliminados\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
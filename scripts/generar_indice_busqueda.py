@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador del Índice de Búsqueda de Destinos
+Sistema de Navegación Interior - UMAG
+
+Este script construye un índice precalculado para la búsqueda de destinos de
+la aplicación, en lugar de comparar strings contra todos los nodos y alias en
+cada pulsación de tecla.
+
+El índice combina:
+- Los nombres legibles extraídos de los IDs de nodo (P1_Sala_TI1 -> "Sala TI1")
+- Los alias de QRUtils.aliasUbicaciones (lib/utils/codigo_qr.dart)
+
+Los términos se normalizan sin acentos (Baños/Banos, Física/Fisica) y se
+serializan como un trie de prefijos más un índice de trigramas para
+búsqueda difusa tolerante a errores de tipeo.
+
+Uso:
+    python generar_indice_busqueda.py              # Genera lib/data/indice_busqueda.json
+    python generar_indice_busqueda.py --benchmark  # Además mide tiempos de consulta
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import os
+import time
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+# Importar funciones compartidas de lectura de grafos
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import RUTA_ALIAS_DART, extraer_numero_piso, iterar_nodos_json, leer_alias_dart
+
+VERSION_INDICE = 1
+RUTA_SALIDA = 'lib/data/indice_busqueda.json'
+
+
+def normalizar(texto):
+    """
+    Normaliza un texto para búsqueda: minúsculas, sin acentos ni símbolos.
+
+    Args:
+        texto (str): Texto original (ej: "Baños Ingeniería")
+
+    Returns:
+        str: Texto normalizado (ej: "banos ingenieria")
+    """
+    descompuesto = unicodedata.normalize('NFD', texto.lower())
+    sin_acentos = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', sin_acentos).split())
+
+
+def extraer_nombre_ubicacion(nodo_id):
+    """
+    Extrae el nombre legible de un nodo a partir de su ID.
+
+    Sigue la misma regla que el script de afiches: quita el prefijo de piso
+    y reemplaza guiones bajos por espacios.
+
+    Args:
+        nodo_id (str): ID del nodo (ej: "P1_Lab_Fisico-Quimica")
+
+    Returns:
+        str: Nombre de la ubicación (ej: "Lab Fisico-Quimica")
+    """
+    nombre = re.sub(r'^P\d+_', '', nodo_id)
+    return nombre.replace('_', ' ')
+
+
+def trigramas(termino):
+    """
+    Calcula el conjunto de trigramas de un término normalizado.
+
+    Cada palabra se rellena con espacios para que los inicios de palabra
+    pesen más y una palabra mal escrita siga compartiendo sus bordes.
+    """
+    resultado = set()
+    for palabra in termino.split(' '):
+        relleno = f"  {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+def construir_entradas(nodos_ids, alias):
+    """
+    Construye la lista de entradas buscables.
+
+    Args:
+        nodos_ids (list): IDs de nodo de todos los pisos
+        alias (dict): Alias -> ID de nodo
+
+    Returns:
+        list: Entradas con id, nombre, piso y términos normalizados
+    """
+    entradas = {}
+    for nodo_id in nodos_ids:
+        nombre = extraer_nombre_ubicacion(nodo_id)
+        entradas[nodo_id] = {
+            'id': nodo_id,
+            'nombre': nombre,
+            'piso': extraer_numero_piso(nodo_id),
+            'alias': [],
+        }
+
+    for nombre_alias, nodo_id in alias.items():
+        if nodo_id not in entradas:
+            print(f"⚠️  Alias '{nombre_alias}' apunta a un nodo inexistente: {nodo_id}")
+            continue
+        entradas[nodo_id]['alias'].append(nombre_alias)
+
+    return sorted(entradas.values(), key=lambda e: (e['piso'], normalizar(e['nombre'])))
+
+
+def terminos_entrada(entrada):
+    """Retorna los términos normalizados (nombre y alias) de una entrada."""
+    terminos = {normalizar(entrada['nombre'])}
+    terminos.update(normalizar(a) for a in entrada['alias'])
+    terminos.discard('')
+    return terminos
+
+
+def construir_indice(entradas):
+    """
+    Construye el trie de prefijos y el índice de trigramas.
+
+    Cada término se inserta completo y a partir de cada una de sus palabras,
+    así "fisica" encuentra "Laboratorio Fisica". Cada nodo del trie guarda
+    en "i" todas las entradas alcanzables, de modo que una consulta por
+    prefijo es un único recorrido sin explorar el subárbol. Cada entrada
+    guarda en "t" su cantidad de trigramas para desempatar la búsqueda difusa.
+
+    Args:
+        entradas (list): Entradas generadas por construir_entradas()
+
+    Returns:
+        dict: Índice serializable a JSON
+    """
+    trie = {'i': [], 'h': {}}
+    indice_trigramas = defaultdict(set)
+    total_trigramas = []
+
+    for posicion, entrada in enumerate(entradas):
+        propios = set()
+        for termino in sorted(terminos_entrada(entrada)):
+            palabras = termino.split(' ')
+            sufijos = {' '.join(palabras[k:]) for k in range(len(palabras))}
+            for sufijo in sorted(sufijos):
+                nodo = trie
+                for caracter in sufijo:
+                    nodo = nodo['h'].setdefault(caracter, {'i': [], 'h': {}})
+                    if not nodo['i'] or nodo['i'][-1] != posicion:
+                        nodo['i'].append(posicion)
+
+            propios.update(trigramas(termino))
+
+        for trigrama in propios:
+            indice_trigramas[trigrama].add(posicion)
+        total_trigramas.append(len(propios))
+
+    return {
+        'version': VERSION_INDICE,
+        'entradas': [
+            {'id': e['id'], 'nombre': e['nombre'], 'piso': e['piso'],
+             'alias': e['alias'], 't': total}
+            for e, total in zip(entradas, total_trigramas)
+        ],
+        'trie': trie,
+        'trigramas': {t: sorted(p) for t, p in sorted(indice_trigramas.items())},
+    }
+
+
+def buscar(indice, consulta, limite=10, umbral=0.5):
+    """
+    Busca entradas por prefijo y, si no hay resultados, por similitud difusa.
+
+    Es la implementación de referencia del algoritmo que debe usar la app.
+
+    Args:
+        indice (dict): Índice generado por construir_indice()
+        consulta (str): Texto ingresado por el usuario
+        limite (int): Máximo de resultados
+        umbral (float): Fracción mínima de trigramas de la consulta que debe
+            contener una entrada para la búsqueda difusa
+
+    Returns:
+        list: Posiciones de las entradas encontradas, de mejor a peor
+    """
+    termino = normalizar(consulta)
+    if not termino:
+        return []
+
+    # 1. Prefijo exacto: recorrer el trie carácter a carácter
+    nodo = indice['trie']
+    for caracter in termino:
+        nodo = nodo['h'].get(caracter)
+        if nodo is None:
+            break
+    else:
+        return nodo['i'][:limite]
+
+    # 2. Difusa: contar trigramas compartidos por entrada
+    trigramas_consulta = trigramas(termino)
+    coincidencias = defaultdict(int)
+    for trigrama in trigramas_consulta:
+        for posicion in indice['trigramas'].get(trigrama, ()):
+            coincidencias[posicion] += 1
+
+    entradas = indice['entradas']
+    puntajes = []
+    for posicion, compartidos in coincidencias.items():
+        cobertura = compartidos / len(trigramas_consulta)
+        if cobertura >= umbral:
+            # A igual cobertura, preferir nombres cortos (más específicos)
+            puntajes.append((-cobertura, entradas[posicion]['t'], posicion))
+    puntajes.sort()
+    return [posicion for _, _, posicion in puntajes[:limite]]
+
+
+def buscar_lineal(entradas, consulta, limite=10):
+    """Búsqueda por comparación directa contra todos los nombres (línea base)."""
+    termino = normalizar(consulta)
+    resultados = []
+    for posicion, entrada in enumerate(entradas):
+        if any(termino in t for t in terminos_entrada(entrada)):
+            resultados.append(posicion)
+            if len(resultados) >= limite:
+                break
+    return resultados
+
+
+def generar_nombres_sinteticos(cantidad, semilla=0):
+    """Genera IDs de nodo sintéticos con el mismo estilo que los reales."""
+    rng = random.Random(semilla)
+    tipos = ['Sala', 'Lab', 'Laboratorio', 'Oficina', 'Pasillo', 'Secretaria',
+             'Baños', 'Escalera', 'Bodega', 'Auditorio', 'Departamento']
+    detalles = ['Física', 'Química', 'Computación', 'Eléctrica', 'Mecánica',
+                'Construcción', 'Biología', 'Matemáticas', 'Norte', 'Sur', 'Centro',
+                'Ingeniería', 'Ciencias', 'Profesores', 'Magíster', 'Tesistas']
+    ids = set()
+    while len(ids) < cantidad:
+        piso = rng.randint(1, 9)
+        partes = [rng.choice(tipos), rng.choice(detalles)]
+        if rng.random() < 0.5:
+            partes.append(str(rng.randint(1, 999)))
+        ids.add(f"P{piso}_" + '_'.join(partes))
+    return sorted(ids)
+
+
+def generar_consultas(entradas, cantidad, semilla=0):
+    """Genera consultas realistas: prefijos, palabras sueltas y errores de tipeo."""
+    rng = random.Random(semilla)
+    consultas = []
+    for _ in range(cantidad):
+        termino = rng.choice(sorted(terminos_entrada(rng.choice(entradas))))
+        palabra = rng.choice(termino.split(' '))
+        modo = rng.random()
+        if modo < 0.4:
+            consultas.append(termino[:rng.randint(1, len(termino))])
+        elif modo < 0.7:
+            consultas.append(palabra[:rng.randint(1, len(palabra))])
+        else:
+            # Error de tipeo: intercambiar dos letras vecinas
+            if len(palabra) > 2:
+                k = rng.randint(0, len(palabra) - 2)
+                palabra = palabra[:k] + palabra[k + 1] + palabra[k] + palabra[k + 2:]
+            consultas.append(palabra)
+    return consultas
+
+
+def medir(funcion, consultas):
+    """Retorna el tiempo medio por consulta en microsegundos."""
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        funcion(consulta)
+    return 1e6 * (time.perf_counter() - inicio) / len(consultas)
+
+
+def ejecutar_benchmark(entradas_reales, indice_real, cantidad_consultas=500):
+    """Compara índice y búsqueda lineal con los nombres reales y sintéticos."""
+    print("\n" + "=" * 70)
+    print("⏱️  BENCHMARK DE CONSULTAS")
+    print("=" * 70)
+    print(f"{'Conjunto':<18}{'Entradas':>10}{'Índice (µs)':>14}{'Lineal (µs)':>14}{'Aciertos':>11}")
+    print("─" * 70)
+
+    conjuntos = [('reales', entradas_reales, indice_real)]
+    for cantidad in (1000, 10000, 50000):
+        entradas = construir_entradas(generar_nombres_sinteticos(cantidad), {})
+        conjuntos.append(('sintéticos', entradas, construir_indice(entradas)))
+
+    for nombre, entradas, indice in conjuntos:
+        consultas = generar_consultas(entradas, cantidad_consultas)
+        t_indice = medir(lambda c: buscar(indice, c), consultas)
+        t_lineal = medir(lambda c: buscar_lineal(entradas, c), consultas)
+        aciertos = sum(1 for c in consultas if buscar(indice, c)) / len(consultas)
+        print(f"{nombre:<18}{len(entradas):>10}{t_indice:>14.1f}{t_lineal:>14.1f}{aciertos:>10.0%}")
+
+    print("─" * 70)
+    print("Aciertos: consultas (incluyendo errores de tipeo) con al menos un resultado")
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Genera el índice de búsqueda de destinos')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Mide tiempos de consulta con nombres reales y sintéticos')
+    args = parser.parse_args()
+
+    directorio_base = Path(__file__).parent.parent
+
+    nodos_ids = []
+    for piso in (1, 2, 3, 4):
+        ruta_grafo = directorio_base / f'lib/data/grafo_piso{piso}.json'
+        if not ruta_grafo.exists():
+            print(f"⚠️  Archivo no encontrado: {ruta_grafo}")
+            continue
+        try:
+            nodos_ids.extend(n['id'] for n in iterar_nodos_json(str(ruta_grafo)) if n.get('id'))
+        except json.JSONDecodeError as e:
+            # No publicar un índice con los destinos de un grafo a medias
+            print(f"❌ Error al leer {ruta_grafo}: {e}")
+            return 1
+    if not nodos_ids:
+        print("❌ Error: No se encontraron nodos en los grafos")
+        return 1
+
+    alias = leer_alias_dart(str(directorio_base / RUTA_ALIAS_DART))
+    entradas = construir_entradas(nodos_ids, alias)
+    indice = construir_indice(entradas)
+
+    ruta_salida = directorio_base / RUTA_SALIDA
+    with open(ruta_salida, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, separators=(',', ':'))
+
+    print("\n" + "=" * 70)
+    print("🔎 ÍNDICE DE BÚSQUEDA DE DESTINOS")
+    print("=" * 70)
+    print(f"📍 Entradas: {len(entradas)} ({len(alias)} alias)")
+    print(f"🔤 Trigramas: {len(indice['trigramas'])}")
+    print(f"📄 Guardado en: {ruta_salida} ({ruta_salida.stat().st_size / 1024:.1f} KB)")
+    print("=" * 70)
+
+    if args.benchmark:
+        ejecutar_benchmark(entradas, indice)
+
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
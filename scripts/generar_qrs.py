@@ -22,6 +22,10 @@ import os
 if sys.platform.startswith('win'):
     os.system('chcp 65001 >nul 2>&1')
 
+# Lectura de grafos y datos de QR (sin dependencias externas)
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import etapa_payloads, iterar_nodos_json
+
 # Configuración de generación de QR
 QR_CONFIG = {
     'version': 1,  # Versión 1 = QR más pequeño posible
@@ -36,80 +40,6 @@ IMAGE_CONFIG = {
     'back_color': 'white',
 }
 
-def leer_grafo_json(ruta_json):
-    """
-    Lee y valida un archivo JSON de grafo.
-    
-    Args:
-        ruta_json (str): Ruta al archivo JSON
-        
-    Returns:
-        dict: Datos del grafo o None si hay error
-    """
-    try:
-        with open(ruta_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if 'nodos' not in data:
-            print(f"⚠️  El archivo no contiene la clave 'nodos': {ruta_json}")
-            return None
-            
-        return data
-    except FileNotFoundError:
-        print(f"❌ Archivo no encontrado: {ruta_json}")
-        return None
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al decodificar JSON: {e}")
-        return None
-    except Exception as e:
-        print(f"❌ Error inesperado al leer {ruta_json}: {e}")
-        return None
-
-def extraer_numero_piso(nodo_id):
-    """
-    Extrae el número de piso del ID del nodo.
-    
-    Args:
-        nodo_id (str): ID del nodo (ej: "P1_Entrada_1")
-        
-    Returns:
-        int: Número de piso o 1 por defecto
-    """
-    try:
-        # Formato esperado: "P{numero}_{resto}"
-        if '_' in nodo_id and nodo_id.startswith('P'):
-            piso_str = nodo_id.split('_')[0].replace('P', '')
-            return int(piso_str)
-    except (ValueError, IndexError):
-        pass
-    
-    return 1  # Piso por defecto
-
-def crear_datos_qr(nodo, piso_default=1):
-    """
-    Crea los datos del QR en el formato esperado por la aplicación.
-    
-    Args:
-        nodo (dict): Datos del nodo
-        piso_default (int): Número de piso por defecto
-        
-    Returns:
-        str: JSON string con los datos del QR
-    """
-    nodo_id = nodo.get('id', '')
-    piso = extraer_numero_piso(nodo_id) if nodo_id else piso_default
-    
-    # Formato compatible con codigo_qr.dart
-    qr_data = {
-        "type": "nodo",
-        "id": nodo_id,
-        "piso": piso,
-        "x": nodo.get('x'),
-        "y": nodo.get('y')
-    }
-    
-    return json.dumps(qr_data, ensure_ascii=False)
-
 def generar_qr_imagen(datos_qr, ruta_salida):
     """
     Genera una imagen de código QR.
@@ -138,26 +68,39 @@ def generar_qr_imagen(datos_qr, ruta_salida):
         print(f"❌ Error generando QR: {e}")
         return False
 
+# ==================== ETAPAS DEL PIPELINE ====================
+# Cada etapa es un generador que consume la anterior, de modo que un nodo
+# se codifica y se escribe antes de que se lea el siguiente del archivo:
+#   iterar_nodos_json → etapa_payloads (datos_grafo.py) → etapa_escribir
+
+def etapa_escribir(payloads, carpeta_salida):
+    """
+    Genera y guarda cada QR como QR_{nodo_id}.png en la carpeta de salida.
+    
+    Yields:
+        tuple: (nombre_archivo, True si se guardó correctamente)
+    """
+    for nodo_id, datos_qr in payloads:
+        nombre_archivo = f"QR_{nodo_id}.png"
+        yield nombre_archivo, generar_qr_imagen(datos_qr, Path(carpeta_salida) / nombre_archivo)
+
 def generar_qrs_desde_grafo(ruta_json, carpeta_salida, numero_piso=None):
     """
     Genera códigos QR para todos los nodos de un grafo.
     
+    Los nodos se procesan en streaming (ver iterar_nodos_json), por lo que
+    la memoria usada no crece con el tamaño del archivo.
+    
     Args:
         ruta_json (str): Ruta al archivo JSON del grafo
         carpeta_salida (str): Carpeta donde guardar los QRs
         numero_piso (int): Número de piso (se extrae del nombre si es None)
         
     Returns:
-        int: Cantidad de QRs generados exitosamente
+        int: Cantidad de QRs generados exitosamente (0 si el grafo no se pudo leer)
     """
-    # Leer grafo
-    grafo = leer_grafo_json(ruta_json)
-    if not grafo:
-        return 0
-    
-    nodos = grafo.get('nodos', [])
-    if not nodos:
-        print(f"⚠️  No hay nodos en el archivo: {ruta_json}")
+    if not Path(ruta_json).exists():
+        print(f"❌ Archivo no encontrado: {ruta_json}")
         return 0
     
     # Extraer número de piso del nombre del archivo si no se especificó
@@ -172,32 +115,41 @@ def generar_qrs_desde_grafo(ruta_json, carpeta_salida, numero_piso=None):
     # Crear carpeta de salida
     Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
     
-    print(f"\n📍 Generando QRs para {len(nodos)} nodos del piso {numero_piso}...")
+    print(f"\n📍 Generando QRs para los nodos del piso {numero_piso}...")
     print(f"📂 Guardando en: {carpeta_salida}")
     print("─" * 70)
     
     exitosos = 0
     errores = 0
+    ultimo = None
     
-    for i, nodo in enumerate(nodos, 1):
-        nodo_id = nodo.get('id', f'nodo_{i}')
-        
-        # Crear datos del QR
-        datos_qr = crear_datos_qr(nodo, numero_piso)
-        
-        # Generar nombre de archivo
-        nombre_archivo = f"QR_{nodo_id}.png"
-        ruta_salida = Path(carpeta_salida) / nombre_archivo
-        
-        # Generar QR
-        if generar_qr_imagen(datos_qr, ruta_salida):
-            exitosos += 1
-            # Mostrar progreso cada 10 nodos o en el último
-            if i % 10 == 0 or i == len(nodos):
-                print(f"  [{i:3d}/{len(nodos)}] ✓ {nombre_archivo}")
-        else:
-            errores += 1
-            print(f"  [{i:3d}/{len(nodos)}] ✗ Error en {nombre_archivo}")
+    nodos = iterar_nodos_json(ruta_json)
+    payloads = etapa_payloads(nodos, numero_piso)
+    
+    try:
+        for i, (nombre_archivo, ok) in enumerate(etapa_escribir(payloads, carpeta_salida), 1):
+            ultimo = (i, nombre_archivo, ok)
+            if ok:
+                exitosos += 1
+                # Mostrar progreso cada 10 nodos
+                if i % 10 == 0:
+                    print(f"  [{i:3d}] ✓ {nombre_archivo}")
+            else:
+                errores += 1
+                print(f"  [{i:3d}] ✗ Error en {nombre_archivo}")
+    except (OSError, json.JSONDecodeError) as e:
+        # Un grafo truncado no es un éxito parcial: los QRs ya escritos
+        # pueden no corresponder a la versión final del archivo
+        print(f"❌ Error al leer {ruta_json}: {e}")
+        if exitosos > 0:
+            print(f"⚠️  Se alcanzaron a escribir {exitosos} QRs antes del error; revisa el grafo")
+        return 0
+    
+    if ultimo is None:
+        print(f"⚠️  No hay nodos en el archivo: {ruta_json}")
+        return 0
+    if ultimo[0] % 10 != 0 and ultimo[2]:
+        print(f"  [{ultimo[0]:3d}] ✓ {ultimo[1]}")
     
     print("─" * 70)
     print(f"✅ Completado: {exitosos} QRs generados correctamente")
@@ -269,7 +221,7 @@ def generar_qrs_todos_los_pisos(directorio_base='.'):
     print(f"  TOTAL:  {total_generados:3d} códigos QR generados")
     print("=" * 70)
     
-    if total_generados > 0:
+    if total_generados > 0 and all(estadisticas.values()):
         print("\n✅ Proceso completado exitosamente")
         print("\n📌 PRÓXIMOS PASOS:")
         print("   1. Revisa los QRs generados en la carpeta 'qr_codes/'")
@@ -278,6 +230,9 @@ def generar_qrs_todos_los_pisos(directorio_base='.'):
         print("   4. Prueba el escaneo con la aplicación móvil")
         print("\n💡 TIP: Los QRs tienen corrección de errores nivel H (30%)")
         print("   Esto permite que funcionen incluso con daños menores.")
+    elif total_generados > 0:
+        print("\n⚠️  Algunos pisos no generaron QRs")
+        print("   Revisa los errores anteriores y los archivos JSON en 'lib/data/'")
     else:
         print("\n⚠️  No se generaron códigos QR")
         print("   Verifica que los archivos JSON existan en 'lib/data/'")
@@ -402,7 +357,8 @@ def main():
         if sum(estadisticas.values()) > 0:
             generar_archivo_info()
         
-        return 0 if sum(estadisticas.values()) > 0 else 1
+        # Cualquier piso sin QRs (archivo faltante o con errores) es un fallo
+        return 0 if estadisticas and all(estadisticas.values()) else 1
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Proceso interrumpido por el usuario")
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de Teselas para los Mapas de Piso
+Sistema de Navegación Interior - UMAG
+
+Este script rasteriza los SVG de Mapas/ en una pirámide de teselas PNG por
+nivel de zoom, para que la app dibuje solo las teselas visibles en lugar de
+interpretar el SVG completo en cada apertura de pantalla_mapa.dart.
+
+Las teselas usan el mismo sistema de coordenadas que los nodos de
+grafo_pisoN.json: la app estira cada SVG a 1200x800 (BoxFit.fill), así que
+en el zoom z la imagen completa mide (1200·2^z) x (800·2^z) píxeles y la
+tesela (x, y) cubre las coordenadas de nodo
+    [x·T/2^z, (x+1)·T/2^z) x [y·T/2^z, (y+1)·T/2^z)
+donde T es el tamaño de tesela. Las teselas vacías no se escriben.
+
+Uso:
+    python generar_teselas_mapas.py [--pisos 1 2] [--zooms 0 1 2 3] [--procesos 4]
+
+Requiere:
+    pip install "pyvips[binary]"
+"""
+
+import argparse
+import json
+import math
+import re
+import shutil
+import sys
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+# Importar funciones compartidas de lectura de grafos
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import iterar_nodos_json
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+# Mismos archivos que PantallaMapa.rutaArchivo en pantalla_mapa.dart
+MAPAS_PISOS = {
+    1: 'Mapas/Primer piso fac_ing simple.svg',
+    2: 'Mapas/Segundo piso fac_ing simple.svg',
+    3: 'Mapas/Tercer piso fac_ing simple.svg',
+    4: 'Mapas/Cuarto piso fac_ing simple.svg',
+}
+
+# Sistema de coordenadas de los nodos (_svgWidthOriginal x _svgHeightOriginal)
+ANCHO_COORDENADAS = 1200
+ALTO_COORDENADAS = 800
+
+TAMANO_TESELA = 256
+ZOOMS_DEFAULT = [0, 1, 2, 3]  # La app permite zoom de 1x a 4x (más densidad de pantalla)
+CARPETA_SALIDA = 'Mapas/teselas'
+
+VERSION_MANIFIESTO = 1
+
+# Imágenes ya cargadas por cada proceso: (ruta_svg, zoom) -> imagen escalada
+_imagenes_cargadas = {}
+
+
+def leer_viewbox(ruta_svg):
+    """
+    Lee el viewBox del elemento <svg> raíz.
+
+    Returns:
+        list: [min_x, min_y, ancho, alto] o None si no se encuentra
+    """
+    with open(ruta_svg, 'r', encoding='utf-8') as f:
+        cabecera = f.read(4096)
+    m = re.search(r'<svg\b[^>]*?\bviewBox="([^"]+)"', cabecera, re.DOTALL)
+    if not m:
+        return None
+    return [float(v) for v in m.group(1).replace(',', ' ').split()]
+
+
+def cargar_mapa_escalado(ruta_svg, zoom):
+    """
+    Carga el SVG escalado al tamaño del zoom indicado.
+
+    El SVG se estira igual que en la app (BoxFit.fill), por lo que la escala
+    horizontal y vertical pueden ser distintas. pyvips renderiza solo las
+    regiones que se recortan después, así que cargar no dibuja el mapa entero.
+    """
+    clave = (ruta_svg, zoom)
+    if clave not in _imagenes_cargadas:
+        ancho_destino = ANCHO_COORDENADAS * 2 ** zoom
+        alto_destino = ALTO_COORDENADAS * 2 ** zoom
+
+        base = pyvips.Image.new_from_file(ruta_svg, access='random')
+        escala = max(ancho_destino / base.width, alto_destino / base.height)
+        imagen = pyvips.Image.new_from_file(ruta_svg, scale=escala, access='random')
+        imagen = imagen.resize(ancho_destino / imagen.width,
+                               vscale=alto_destino / imagen.height)
+        # Redondeo del resize: recortar al tamaño exacto
+        imagen = imagen.crop(0, 0, min(ancho_destino, imagen.width),
+                             min(alto_destino, imagen.height))
+        _imagenes_cargadas[clave] = imagen
+    return _imagenes_cargadas[clave]
+
+
+def tesela_vacia(tesela):
+    """Retorna True si la tesela no tiene contenido visible."""
+    if tesela.bands in (2, 4):
+        return tesela[tesela.bands - 1].max() == 0
+    return tesela.max() == tesela.min()
+
+
+def renderizar_fila(tarea):
+    """
+    Renderiza y guarda una fila de teselas (se ejecuta en un proceso aparte).
+
+    Args:
+        tarea (tuple): (piso, ruta_svg, zoom, fila, carpeta_salida)
+
+    Returns:
+        tuple: (piso, zoom, fila, columnas escritas)
+    """
+    piso, ruta_svg, zoom, fila, carpeta_salida = tarea
+    imagen = cargar_mapa_escalado(ruta_svg, zoom)
+    columnas = math.ceil(imagen.width / TAMANO_TESELA)
+    carpeta = Path(carpeta_salida) / f'piso{piso}' / str(zoom) / str(fila)
+
+    escritas = []
+    y = fila * TAMANO_TESELA
+    alto = min(TAMANO_TESELA, imagen.height - y)
+    for columna in range(columnas):
+        x = columna * TAMANO_TESELA
+        ancho = min(TAMANO_TESELA, imagen.width - x)
+        tesela = imagen.crop(x, y, ancho, alto)
+        if tesela_vacia(tesela):
+            continue
+        if ancho < TAMANO_TESELA or alto < TAMANO_TESELA:
+            # Completar las teselas del borde con transparencia
+            tesela = tesela.embed(0, 0, TAMANO_TESELA, TAMANO_TESELA)
+        carpeta.mkdir(parents=True, exist_ok=True)
+        tesela.pngsave(str(carpeta / f'{columna}.png'), compression=9, palette=True)
+        escritas.append(columna)
+    return piso, zoom, fila, escritas
+
+
+def limites_nodos(ruta_grafo):
+    """Calcula el rectángulo que contiene todos los nodos de un piso."""
+    xs, ys = [], []
+    try:
+        for nodo in iterar_nodos_json(str(ruta_grafo)):
+            if nodo.get('x') is not None and nodo.get('y') is not None:
+                xs.append(nodo['x'])
+                ys.append(nodo['y'])
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  No se pudieron leer los nodos de {ruta_grafo}: {e}")
+        return None
+    if not xs:
+        return None
+    return {'min_x': min(xs), 'min_y': min(ys), 'max_x': max(xs), 'max_y': max(ys)}
+
+
+def generar_teselas(directorio_base, pisos, zooms, carpeta_salida, procesos=None):
+    """
+    Genera las teselas de todos los pisos y zooms usando un pool de procesos.
+
+    Returns:
+        dict: Manifiesto con la geometría y las teselas escritas por piso
+    """
+    manifiesto = {
+        'version': VERSION_MANIFIESTO,
+        'tamano_tesela': TAMANO_TESELA,
+        'coordenadas': {'ancho': ANCHO_COORDENADAS, 'alto': ALTO_COORDENADAS},
+        'ruta': 'piso{piso}/{z}/{y}/{x}.png',
+        'pisos': {},
+    }
+
+    tareas = []
+    for piso in pisos:
+        ruta_svg = directorio_base / MAPAS_PISOS[piso]
+        if not ruta_svg.exists():
+            print(f"⚠️  Archivo no encontrado: {ruta_svg}")
+            continue
+
+        # Las teselas de ejecuciones anteriores (otros zooms u otra versión
+        # del mapa) se borran para que la carpeta coincida con el manifiesto
+        carpeta_piso = Path(carpeta_salida) / f'piso{piso}'
+        if carpeta_piso.exists():
+            shutil.rmtree(carpeta_piso)
+
+        viewbox = leer_viewbox(ruta_svg)
+        info_piso = {
+            'svg': MAPAS_PISOS[piso],
+            'viewbox': viewbox,
+            'limites_nodos': limites_nodos(directorio_base / f'lib/data/grafo_piso{piso}.json'),
+            'zooms': {},
+        }
+        if viewbox:
+            # Para pasar de coordenadas de nodo a unidades del viewBox del SVG
+            info_piso['factor_svg'] = [viewbox[2] / ANCHO_COORDENADAS,
+                                       viewbox[3] / ALTO_COORDENADAS]
+
+        for zoom in zooms:
+            escala = 2 ** zoom
+            ancho_px = ANCHO_COORDENADAS * escala
+            alto_px = ALTO_COORDENADAS * escala
+            filas = math.ceil(alto_px / TAMANO_TESELA)
+            info_piso['zooms'][str(zoom)] = {
+                'escala': escala,
+                'ancho_px': ancho_px,
+                'alto_px': alto_px,
+                'columnas': math.ceil(ancho_px / TAMANO_TESELA),
+                'filas': filas,
+                'unidades_por_tesela': TAMANO_TESELA / escala,
+                'teselas': [],
+            }
+            tareas.extend((piso, str(ruta_svg), zoom, fila, str(carpeta_salida))
+                          for fila in range(filas))
+
+        manifiesto['pisos'][str(piso)] = info_piso
+
+    # Las tareas más grandes (zoom alto) primero para balancear el pool
+    tareas.sort(key=lambda t: -t[2])
+
+    total = 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for piso, zoom, fila, columnas in pool.map(renderizar_fila, tareas, chunksize=4):
+            teselas = manifiesto['pisos'][str(piso)]['zooms'][str(zoom)]['teselas']
+            teselas.extend([columna, fila] for columna in columnas)
+            total += len(columnas)
+
+    for info_piso in manifiesto['pisos'].values():
+        for info_zoom in info_piso['zooms'].values():
+            info_zoom['teselas'].sort(key=lambda t: (t[1], t[0]))
+
+    return manifiesto, total
+
+
+def combinar_manifiesto(ruta_manifiesto, manifiesto):
+    """
+    Combina el manifiesto de esta ejecución con el existente.
+
+    Los pisos procesados reemplazan su entrada completa y los demás se
+    conservan, siempre que el manifiesto anterior use la misma versión y
+    geometría de teselas. Si no, sus pisos se descartan con un aviso.
+
+    Returns:
+        dict: Manifiesto combinado
+    """
+    if not ruta_manifiesto.exists():
+        return manifiesto
+    try:
+        with open(ruta_manifiesto, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️  No se pudo leer el manifiesto anterior ({e}); se reemplaza")
+        return manifiesto
+
+    claves_geometria = ('version', 'tamano_tesela', 'coordenadas', 'ruta')
+    pisos_anteriores = {p: info for p, info in anterior.get('pisos', {}).items()
+                        if p not in manifiesto['pisos']}
+    if any(anterior.get(k) != manifiesto[k] for k in claves_geometria):
+        if pisos_anteriores:
+            print(f"⚠️  El manifiesto anterior usa otra geometría de teselas; "
+                  f"regenera los pisos {', '.join(sorted(pisos_anteriores))}")
+        return manifiesto
+
+    manifiesto['pisos'] = dict(sorted({**pisos_anteriores, **manifiesto['pisos']}.items()))
+    return manifiesto
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Genera teselas PNG de los mapas de piso')
+    parser.add_argument('--pisos', type=int, nargs='+', default=sorted(MAPAS_PISOS),
+                        choices=sorted(MAPAS_PISOS), help='Pisos a procesar (default: todos)')
+    parser.add_argument('--zooms', type=int, nargs='+', default=ZOOMS_DEFAULT,
+                        help='Niveles de zoom; el zoom z escala 2^z (default: 0 1 2 3)')
+    parser.add_argument('--procesos', type=int, default=None,
+                        help='Procesos en paralelo (default: uno por CPU)')
+    parser.add_argument('--salida', default=CARPETA_SALIDA,
+                        help=f'Carpeta de salida relativa al proyecto (default: {CARPETA_SALIDA})')
+    args = parser.parse_args()
+
+    if pyvips is None:
+        print("❌ Error: Se requiere pyvips para rasterizar los SVG")
+        print('   pip install "pyvips[binary]"')
+        return 1
+
+    directorio_base = Path(__file__).parent.parent
+    carpeta_salida = directorio_base / args.salida
+
+    print("\n" + "=" * 70)
+    print("🗺️  GENERADOR DE TESELAS DE MAPAS")
+    print("=" * 70)
+    print(f"📍 Pisos: {args.pisos} · Zooms: {args.zooms} · Tesela: {TAMANO_TESELA}px")
+    print(f"📂 Guardando en: {carpeta_salida}")
+    print("─" * 70)
+
+    inicio = time.perf_counter()
+    manifiesto, total = generar_teselas(directorio_base, args.pisos, sorted(set(args.zooms)),
+                                        carpeta_salida, args.procesos)
+    duracion = time.perf_counter() - inicio
+
+    carpeta_salida.mkdir(parents=True, exist_ok=True)
+    ruta_manifiesto = carpeta_salida / 'manifiesto.json'
+    pisos_procesados = dict(manifiesto['pisos'])
+    manifiesto = combinar_manifiesto(ruta_manifiesto, manifiesto)
+    with open(ruta_manifiesto, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=1)
+
+    for piso, info_piso in pisos_procesados.items():
+        for zoom, info_zoom in info_piso['zooms'].items():
+            posibles = info_zoom['columnas'] * info_zoom['filas']
+            print(f"  Piso {piso} · zoom {zoom}: {len(info_zoom['teselas']):4d} de "
+                  f"{posibles:4d} teselas ({posibles - len(info_zoom['teselas'])} vacías omitidas)")
+
+    print("─" * 70)
+    print(f"✅ {total} teselas generadas en {duracion:.1f}s")
+    print(f"📄 Manifiesto: {ruta_manifiesto} (pisos {', '.join(manifiesto['pisos'])})\n")
+    return 0 if total > 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
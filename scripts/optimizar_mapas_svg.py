@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optimizador de Mapas SVG
+Sistema de Navegación Interior - UMAG
+
+Este script reduce el tamaño de los SVG de Mapas/ que la app empaqueta e
+interpreta con flutter_svg:
+- Elimina contenido exclusivo del editor (Inkscape, Sodipodi, LibreCAD) y
+  los ids que nada referencia (url(#id), href="#id")
+- Cuantiza las coordenadas a la precisión que la app realmente puede mostrar
+- Une los <line> consecutivos con el mismo estilo en un solo <path>,
+  encadenando los segmentos que comparten extremos en polilíneas
+- Simplifica las polilíneas con Douglas-Peucker (vectorizado con NumPy)
+
+La tolerancia se expresa en píxeles de pantalla con el zoom máximo de la app
+(4x sobre el sistema 1200x800, con densidad de pantalla 3x), y se convierte a
+unidades de cada grupo según su transform.
+
+Uso:
+    python optimizar_mapas_svg.py [--tolerancia 0.5] [--salida Mapas/optimizados]
+
+Requiere:
+    pip install numpy
+"""
+
+import argparse
+import math
+import re
+import statistics
+import sys
+import os
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# Configurar encoding UTF-8 para Windows
+if sys.platform.startswith('win'):
+    os.system('chcp 65001 >nul 2>&1')
+
+import numpy as np
+
+# Importar configuración del generador de teselas
+sys.path.insert(0, str(Path(__file__).parent))
+from generar_teselas_mapas import ALTO_COORDENADAS, ANCHO_COORDENADAS, MAPAS_PISOS
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+# Espacios de nombres que solo usan los editores
+NS_EDITOR = (
+    'http://www.inkscape.org/namespaces/inkscape',
+    'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+    'https://librecad.org',
+)
+
+ZOOM_MAXIMO_APP = 4.0  # _maxScale en pantalla_mapa.dart
+DENSIDAD_PANTALLA = 3.0  # devicePixelRatio de un teléfono de gama alta
+TOLERANCIA_PX = 0.5
+CARPETA_SALIDA = 'Mapas/optimizados'
+
+ATRIBUTOS_LINEA = ('x1', 'y1', 'x2', 'y2')
+PATRON_NUMERO = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATRON_MATRIX = re.compile(r'matrix\(([^)]*)\)')
+PATRON_URL_ID = re.compile(r'url\(\s*["\']?#([^)"\'\s]+)')
+
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+
+def _etiqueta(elemento):
+    """Retorna el nombre de la etiqueta sin espacio de nombres."""
+    return elemento.tag.rsplit('}', 1)[-1]
+
+
+def _es_de_editor(nombre):
+    """True si una etiqueta o atributo pertenece a un espacio de nombres de editor."""
+    return any(nombre.startswith('{' + ns + '}') for ns in NS_EDITOR)
+
+
+def escala_transform(transform):
+    """
+    Calcula el factor de escala (medio) de un atributo transform.
+
+    Solo se consideran matrix(), scale() y translate(), que son los que
+    exporta LibreCAD/Inkscape en estos mapas.
+    """
+    if not transform:
+        return 1.0
+    m = PATRON_MATRIX.search(transform)
+    if m:
+        a, b, c, d = [float(v) for v in PATRON_NUMERO.findall(m.group(1))[:4]]
+        return math.sqrt(abs(a * d - b * c)) or 1.0
+    m = re.search(r'scale\(([^)]*)\)', transform)
+    if m:
+        valores = [float(v) for v in PATRON_NUMERO.findall(m.group(1))]
+        sx = valores[0]
+        sy = valores[1] if len(valores) > 1 else sx
+        return math.sqrt(abs(sx * sy)) or 1.0
+    return 1.0
+
+
+def decimales_para(cuanto):
+    """Cantidad de decimales necesaria para representar el cuanto indicado."""
+    if cuanto >= 1:
+        return 0
+    return int(math.ceil(-math.log10(cuanto)))
+
+
+def formatear_entero(valor, decimales):
+    """
+    Formatea un número cuantizado (entero en unidades de 10^-decimales).
+
+    Produce la forma más corta: sin ceros finales ni cero inicial (".5").
+    """
+    signo = '-' if valor < 0 else ''
+    texto = str(abs(int(valor)))
+    if decimales:
+        texto = texto.rjust(decimales + 1, '0')
+        entero, fraccion = texto[:-decimales], texto[-decimales:].rstrip('0')
+        entero = '' if entero == '0' and fraccion else entero
+        texto = f"{entero}.{fraccion}" if fraccion else entero
+    return signo + texto if texto != '0' else '0'
+
+
+def formatear(valor, decimales):
+    """Cuantiza y formatea un número real."""
+    return formatear_entero(round(valor * 10 ** decimales), decimales)
+
+
+def unir_numeros(textos):
+    """Une números omitiendo separadores innecesarios ("1-2" en lugar de "1 -2")."""
+    resultado = []
+    for texto in textos:
+        if resultado and not (texto.startswith('-') or
+                              (texto.startswith('.') and '.' in resultado[-1])):
+            resultado.append(' ')
+        resultado.append(texto)
+    return ''.join(resultado)
+
+
+def douglas_peucker(puntos, tolerancia):
+    """
+    Simplifica una polilínea con el algoritmo de Douglas-Peucker.
+
+    La búsqueda del punto más lejano de cada tramo se calcula vectorizada.
+
+    Args:
+        puntos (ndarray): Arreglo (n, 2) de coordenadas
+        tolerancia (float): Distancia máxima permitida al trazo original
+
+    Returns:
+        ndarray: Puntos conservados
+    """
+    n = len(puntos)
+    if n < 3:
+        return puntos
+    conservar = np.zeros(n, dtype=bool)
+    conservar[0] = conservar[-1] = True
+    pendientes = [(0, n - 1)]
+
+    while pendientes:
+        i, j = pendientes.pop()
+        if j - i < 2:
+            continue
+        inicio, fin = puntos[i], puntos[j]
+        tramo = puntos[i + 1:j]
+        direccion = fin - inicio
+        largo = math.hypot(direccion[0], direccion[1])
+        if largo == 0:
+            distancias = np.hypot(tramo[:, 0] - inicio[0], tramo[:, 1] - inicio[1])
+        else:
+            relativo = tramo - inicio
+            distancias = np.abs(direccion[0] * relativo[:, 1] - direccion[1] * relativo[:, 0]) / largo
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia:
+            indice = i + 1 + k
+            conservar[indice] = True
+            pendientes.append((i, indice))
+            pendientes.append((indice, j))
+
+    return puntos[conservar]
+
+
+def encadenar_segmentos(segmentos):
+    """
+    Une segmentos que comparten extremos en polilíneas.
+
+    Args:
+        segmentos (ndarray): Arreglo (n, 4) de enteros cuantizados x1, y1, x2, y2
+
+    Returns:
+        list: Polilíneas como arreglos (m, 2) de enteros
+    """
+    extremos = {}
+    for indice, (x1, y1, x2, y2) in enumerate(segmentos.tolist()):
+        extremos.setdefault((x1, y1), []).append(indice)
+        extremos.setdefault((x2, y2), []).append(indice)
+
+    usados = np.zeros(len(segmentos), dtype=bool)
+    lista = segmentos.tolist()
+
+    def extender(cadena):
+        while True:
+            candidatos = [s for s in extremos[cadena[-1]] if not usados[s]]
+            if not candidatos:
+                return
+            s = candidatos[0]
+            usados[s] = True
+            x1, y1, x2, y2 = lista[s]
+            cadena.append((x2, y2) if (x1, y1) == cadena[-1] else (x1, y1))
+
+    polilineas = []
+    for indice, (x1, y1, x2, y2) in enumerate(lista):
+        if usados[indice]:
+            continue
+        usados[indice] = True
+        hacia_adelante = [(x1, y1), (x2, y2)]
+        extender(hacia_adelante)
+        hacia_atras = [(x1, y1)]
+        extender(hacia_atras)
+        cadena = hacia_atras[:0:-1] + hacia_adelante
+        polilineas.append(np.array(cadena, dtype=np.int64))
+    return polilineas
+
+
+def lineas_a_path(lineas, decimales, tolerancia):
+    """
+    Convierte un grupo de <line> con el mismo estilo en los datos de un <path>.
+
+    Returns:
+        tuple: (atributo d, cantidad de puntos antes, cantidad de puntos después)
+    """
+    factor = 10 ** decimales
+    coordenadas = np.array([[float(l.get(a, 0)) for a in ATRIBUTOS_LINEA] for l in lineas])
+    segmentos = np.rint(coordenadas * factor).astype(np.int64)
+
+    comandos = []
+    puntos_antes = 0
+    puntos_despues = 0
+    for polilinea in encadenar_segmentos(segmentos):
+        puntos_antes += len(polilinea)
+        if len(polilinea) > 2:
+            simplificada = douglas_peucker(polilinea.astype(np.float64), tolerancia * factor)
+            polilinea = simplificada.astype(np.int64)
+        puntos_despues += len(polilinea)
+
+        # Coordenadas absolutas del inicio y deltas exactos (sin acumular error)
+        x0, y0 = polilinea[0]
+        deltas = np.diff(polilinea, axis=0).ravel().tolist()
+        texto = 'M' + unir_numeros([formatear_entero(x0, decimales), formatear_entero(y0, decimales)])
+        if deltas:
+            texto += 'l' + unir_numeros([formatear_entero(v, decimales) for v in deltas])
+        comandos.append(texto)
+
+    return ''.join(comandos), puntos_antes, puntos_despues
+
+
+def cuantizar_path(d, decimales):
+    """Cuantiza los números de un atributo d, compactando separadores."""
+    partes = re.findall(r'[A-Za-z]|' + PATRON_NUMERO.pattern, d)
+    resultado = []
+    numeros = []
+    for parte in partes:
+        if parte[0].isalpha():
+            if numeros:
+                resultado.append(unir_numeros(numeros))
+                numeros = []
+            resultado.append(parte)
+        else:
+            numeros.append(formatear(float(parte), decimales))
+    if numeros:
+        resultado.append(unir_numeros(numeros))
+    return ''.join(resultado)
+
+
+def ids_referenciados(raiz):
+    """
+    Reúne los ids que el propio SVG referencia.
+
+    Los degradados, clipPath, marcadores y <use> se enlazan por id mediante
+    url(#id) en atributos o en <style>, y href / xlink:href="#id".
+
+    Args:
+        raiz (Element): Raíz del SVG
+
+    Returns:
+        set: Ids que deben conservarse
+    """
+    referenciados = set()
+    for elemento in raiz.iter():
+        for atributo, valor in elemento.attrib.items():
+            if atributo in ('href', f'{{{XLINK_NS}}}href') and valor.startswith('#'):
+                referenciados.add(valor[1:])
+            else:
+                referenciados.update(PATRON_URL_ID.findall(valor))
+        if elemento.text:
+            referenciados.update(PATRON_URL_ID.findall(elemento.text))
+    return referenciados
+
+
+def _limpiar_atributos(elemento, ids_conservados):
+    """Quita los atributos de editor y el id si nada lo referencia."""
+    for atributo in list(elemento.attrib):
+        if _es_de_editor(atributo) or (atributo == 'id'
+                                       and elemento.get('id') not in ids_conservados):
+            del elemento.attrib[atributo]
+
+
+def _clave_estilo(elemento):
+    """Atributos de presentación que deben coincidir para unir líneas."""
+    return tuple(sorted((k, v) for k, v in elemento.attrib.items()
+                        if k not in ATRIBUTOS_LINEA and k != 'id'))
+
+
+def optimizar_elemento(padre, unidades_por_px, tolerancia_px, estadisticas, escala=1.0,
+                       ids_conservados=frozenset()):
+    """
+    Optimiza recursivamente los hijos de un elemento SVG.
+
+    Args:
+        padre (Element): Elemento a procesar
+        unidades_por_px (float): Unidades del viewBox por píxel de pantalla
+        tolerancia_px (float): Error máximo permitido, en píxeles de pantalla
+        estadisticas (dict): Contadores que se actualizan
+        escala (float): Escala acumulada de los transform de los ancestros
+        ids_conservados (set): Ids referenciados que no se deben eliminar
+    """
+    escala *= escala_transform(padre.get('transform'))
+    tolerancia = tolerancia_px * unidades_por_px / escala
+    decimales = decimales_para(tolerancia)
+
+    hijos = list(padre)
+    for hijo in hijos:
+        padre.remove(hijo)
+
+    corrida = []
+
+    def vaciar_corrida():
+        if not corrida:
+            return
+        path = ET.Element(f'{{{SVG_NS}}}path', dict(_clave_estilo(corrida[0])))
+        d, antes, despues = lineas_a_path(corrida, decimales, tolerancia)
+        path.set('d', d)
+        padre.append(path)
+        estadisticas['lineas'] += len(corrida)
+        estadisticas['paths_creados'] += 1
+        estadisticas['puntos_antes'] += antes
+        estadisticas['puntos_despues'] += despues
+        corrida.clear()
+
+    for hijo in hijos:
+        if _es_de_editor(hijo.tag) or _etiqueta(hijo) in ('metadata', 'namedview'):
+            continue
+        _limpiar_atributos(hijo, ids_conservados)
+
+        etiqueta = _etiqueta(hijo)
+        # Una línea referenciada por id se deja sola para no perder su id
+        if etiqueta == 'line' and 'id' not in hijo.attrib:
+            if corrida and _clave_estilo(corrida[0]) != _clave_estilo(hijo):
+                vaciar_corrida()
+            corrida.append(hijo)
+            continue
+
+        vaciar_corrida()
+        if etiqueta == 'defs' and len(hijo) == 0:
+            continue
+        if etiqueta == 'path' and hijo.get('d'):
+            hijo.set('d', cuantizar_path(hijo.get('d'), decimales))
+        elif etiqueta == 'circle':
+            for atributo in ('cx', 'cy', 'r'):
+                if hijo.get(atributo) is not None:
+                    hijo.set(atributo, formatear(float(hijo.get(atributo)), decimales))
+        elif len(hijo):
+            optimizar_elemento(hijo, unidades_por_px, tolerancia_px, estadisticas, escala,
+                               ids_conservados)
+        padre.append(hijo)
+
+    vaciar_corrida()
+
+
+def optimizar_svg(contenido, tolerancia_px=TOLERANCIA_PX):
+    """
+    Optimiza el contenido de un SVG.
+
+    Args:
+        contenido (bytes): SVG original
+        tolerancia_px (float): Error máximo permitido, en píxeles de pantalla
+
+    Returns:
+        tuple: (SVG optimizado en bytes, estadísticas)
+    """
+    raiz = ET.fromstring(contenido)
+    viewbox = [float(v) for v in raiz.get('viewBox', '').replace(',', ' ').split()]
+    if len(viewbox) != 4:
+        raise ValueError("El SVG no tiene un viewBox válido")
+
+    # Píxeles de pantalla por unidad del viewBox con el zoom máximo (BoxFit.fill)
+    px_por_unidad = max(ANCHO_COORDENADAS / viewbox[2], ALTO_COORDENADAS / viewbox[3])
+    px_por_unidad *= ZOOM_MAXIMO_APP * DENSIDAD_PANTALLA
+
+    ids_conservados = ids_referenciados(raiz)
+    _limpiar_atributos(raiz, ids_conservados)
+
+    estadisticas = {'lineas': 0, 'paths_creados': 0, 'puntos_antes': 0, 'puntos_despues': 0}
+    optimizar_elemento(raiz, 1 / px_por_unidad, tolerancia_px, estadisticas,
+                       ids_conservados=ids_conservados)
+
+    salida = ET.tostring(raiz, encoding='utf-8', xml_declaration=True, short_empty_elements=True)
+    return salida, estadisticas
+
+
+def medir_parseo(contenido, repeticiones=5):
+    """Tiempo mediano (ms) de parsear el XML y recorrer todos sus elementos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in ET.fromstring(contenido).iter():
+            pass
+        tiempos.append(time.perf_counter() - inicio)
+    return 1000 * statistics.median(tiempos)
+
+
+def main():
+    """Función principal del script."""
+    parser = argparse.ArgumentParser(description='Optimiza los mapas SVG de la app')
+    parser.add_argument('--pisos', type=int, nargs='+', default=sorted(MAPAS_PISOS),
+                        choices=sorted(MAPAS_PISOS), help='Pisos a procesar (default: todos)')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_PX,
+                        help=f'Error máximo en píxeles de pantalla (default: {TOLERANCIA_PX})')
+    parser.add_argument('--salida', default=CARPETA_SALIDA,
+                        help=f'Carpeta de salida relativa al proyecto (default: {CARPETA_SALIDA})')
+    args = parser.parse_args()
+
+    directorio_base = Path(__file__).parent.parent
+    carpeta_salida = directorio_base / args.salida
+    carpeta_salida.mkdir(parents=True, exist_ok=True)
+
+    print("\n" + "=" * 70)
+    print("🗜️  OPTIMIZADOR DE MAPAS SVG")
+    print("=" * 70)
+    print(f"📏 Tolerancia: {args.tolerancia} px de pantalla "
+          f"(zoom {ZOOM_MAXIMO_APP:g}x, densidad {DENSIDAD_PANTALLA:g}x)")
+    print(f"📂 Guardando en: {carpeta_salida}")
+    print("─" * 70)
+    print(f"{'Piso':<6}{'Original':>11}{'Optimizado':>12}{'Ahorro':>9}"
+          f"{'Parseo antes':>14}{'después':>10}{'Puntos':>15}")
+
+    total_antes = 0
+    total_despues = 0
+    for piso in args.pisos:
+        ruta_svg = directorio_base / MAPAS_PISOS[piso]
+        if not ruta_svg.exists():
+            print(f"⚠️  Archivo no encontrado: {ruta_svg}")
+            continue
+
+        original = ruta_svg.read_bytes()
+        try:
+            optimizado, estadisticas = optimizar_svg(original, args.tolerancia)
+        except (ET.ParseError, ValueError) as e:
+            print(f"❌ Error procesando {ruta_svg.name}: {e}")
+            continue
+        (carpeta_salida / ruta_svg.name).write_bytes(optimizado)
+
+        total_antes += len(original)
+        total_despues += len(optimizado)
+        ahorro = 1 - len(optimizado) / len(original)
+        puntos = f"{estadisticas['puntos_antes']}→{estadisticas['puntos_despues']}"
+        print(f"{piso:<6}{len(original) / 1024:>9.1f}KB{len(optimizado) / 1024:>10.1f}KB"
+              f"{ahorro:>9.0%}{medir_parseo(original):>12.1f}ms"
+              f"{medir_parseo(optimizado):>8.1f}ms{puntos:>15}")
+
+    if total_antes:
+        print("─" * 70)
+        print(f"✅ Total: {total_antes / 1024:.1f} KB → {total_despues / 1024:.1f} KB "
+              f"({total_antes - total_despues:,} bytes ahorrados)\n")
+    return 0 if total_antes else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los Parches de Grafos
+Sistema de Navegación Interior - UMAG
+
+Genera parches entre versiones de grafos, los aplica y verifica que el
+resultado coincida con la versión nueva, incluyendo archivos eliminados,
+parches vacíos y parches que no corresponden a la versión base.
+
+Uso:
+    python test_delta_grafo.py
+    python -m pytest scripts/test_delta_grafo.py
+"""
+
+import copy
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+# Importar funciones del script de parches
+sys.path.insert(0, str(Path(__file__).parent))
+from delta_grafo import (aplicar_delta, aplicar_parche, calcular_delta, generar_parche,
+                         hash_grafo)
+
+
+def grafo_base():
+    """Grafo pequeño con un par origen→destino repetido, como grafo_piso2.json."""
+    return {
+        'nodos': [
+            {'id': 'P2_Entrada', 'x': 10, 'y': 20},
+            {'id': 'P2_Pasillo', 'x': 30, 'y': 40},
+            {'id': 'P2_Escalera', 'x': 50, 'y': 60},
+            {'id': 'P2_Sala_1', 'x': 70, 'y': 80},
+        ],
+        'conexiones': [
+            {'origen': 'P2_Entrada', 'destino': 'P2_Pasillo', 'distancia': 20.0},
+            {'origen': 'P2_Pasillo', 'destino': 'P2_Escalera', 'distancia': 28.3},
+            {'origen': 'P2_Pasillo', 'destino': 'P2_Escalera', 'distancia': 30.0},
+            {'origen': 'P2_Pasillo', 'destino': 'P2_Sala_1', 'distancia': 56.6},
+        ],
+    }
+
+
+def guardar(ruta, grafo):
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(grafo, f, ensure_ascii=False, indent=2)
+
+
+def leer(ruta):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class PruebasDelta(unittest.TestCase):
+
+    def test_ida_y_vuelta_con_cambios(self):
+        viejo = grafo_base()
+        nuevo = copy.deepcopy(viejo)
+        nuevo['nodos'][1]['x'] = 35                          # modificado
+        del nuevo['nodos'][3]                                # eliminado
+        nuevo['nodos'].append({'id': 'P2_Sala_2', 'x': 90, 'y': 10})   # agregado
+        nuevo['conexiones'][0]['distancia'] = 21.0
+        del nuevo['conexiones'][3]
+        nuevo['conexiones'].append({'origen': 'P2_Entrada', 'destino': 'P2_Sala_2',
+                                    'distancia': 80.0})
+        nuevo['escala'] = 0.25
+
+        delta = calcular_delta(viejo, nuevo, 2)
+        self.assertEqual(delta['qr_afectados'], ['P2_Pasillo', 'P2_Sala_1', 'P2_Sala_2'])
+        self.assertEqual(hash_grafo(aplicar_delta(viejo, delta)), hash_grafo(nuevo))
+
+    def test_pares_de_conexiones_repetidos(self):
+        viejo = grafo_base()
+        nuevo = copy.deepcopy(viejo)
+        nuevo['conexiones'][2]['distancia'] = 1.0
+
+        delta = calcular_delta(viejo, nuevo, 2)
+        modificadas = delta['conexiones']['modificadas']
+        self.assertEqual(len(modificadas), 1)
+        self.assertEqual(len(modificadas[0]['conexiones']), 2)
+        self.assertEqual(hash_grafo(aplicar_delta(viejo, delta)), hash_grafo(nuevo))
+
+    def test_base_incorrecta_se_rechaza(self):
+        viejo = grafo_base()
+        nuevo = copy.deepcopy(viejo)
+        nuevo['nodos'][0]['x'] = 11
+        delta = calcular_delta(viejo, nuevo, 2)
+
+        otra_base = copy.deepcopy(viejo)
+        otra_base['nodos'][2]['y'] = 61
+        with self.assertRaises(ValueError):
+            aplicar_delta(otra_base, delta)
+
+
+class PruebasParcheArchivos(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def generar_y_aplicar(self, viejo, nuevo, salida):
+        with redirect_stdout(StringIO()):
+            parche = generar_parche(str(viejo), str(nuevo))
+            # Pasar por JSON como el archivo real del parche
+            parche = json.loads(json.dumps(parche))
+            return parche, aplicar_parche(str(viejo), parche, str(salida))
+
+    def test_carpeta_con_archivo_modificado_eliminado_y_nuevo(self):
+        viejo, nuevo, salida = self.tmp / 'viejo', self.tmp / 'nuevo', self.tmp / 'salida'
+        for piso in (1, 2, 4):
+            guardar(viejo / f'grafo_piso{piso}.json', grafo_base())
+        guardar(nuevo / 'grafo_piso1.json', grafo_base())
+        modificado = grafo_base()
+        modificado['nodos'][0]['y'] = 25
+        guardar(nuevo / 'grafo_piso2.json', modificado)
+        guardar(nuevo / 'grafo_piso5.json', {'nodos': [{'id': 'P5_A', 'x': 1, 'y': 2}],
+                                             'conexiones': []})
+
+        parche, actualizados = self.generar_y_aplicar(viejo, nuevo, salida)
+        self.assertEqual(actualizados, 3)
+        self.assertEqual(parche['archivos']['grafo_piso4.json']['qr_afectados'],
+                         sorted(n['id'] for n in grafo_base()['nodos']))
+        self.assertEqual(sorted(p.name for p in salida.iterdir()),
+                         ['grafo_piso1.json', 'grafo_piso2.json', 'grafo_piso5.json'])
+        for ruta in nuevo.iterdir():
+            self.assertEqual(hash_grafo(leer(salida / ruta.name)), hash_grafo(leer(ruta)))
+
+    def test_archivo_eliminado_se_borra_al_aplicar_en_el_lugar(self):
+        viejo, nuevo = self.tmp / 'viejo', self.tmp / 'nuevo'
+        guardar(viejo / 'grafo_piso1.json', grafo_base())
+        guardar(viejo / 'grafo_piso4.json', grafo_base())
+        guardar(nuevo / 'grafo_piso1.json', grafo_base())
+
+        _, actualizados = self.generar_y_aplicar(viejo, nuevo, viejo)
+        self.assertEqual(actualizados, 1)
+        self.assertEqual([p.name for p in viejo.iterdir()], ['grafo_piso1.json'])
+
+    def test_parche_vacio_archivo_suelto_escribe_copia(self):
+        base = self.tmp / 'a.json'
+        guardar(base, grafo_base())
+
+        parche, actualizados = self.generar_y_aplicar(base, base, self.tmp / 'c.json')
+        self.assertEqual(parche['archivos'], {})
+        self.assertEqual(actualizados, 0)
+        self.assertEqual((self.tmp / 'c.json').read_bytes(), base.read_bytes())
+
+    def test_parche_vacio_carpeta_copia_todo(self):
+        viejo = self.tmp / 'viejo'
+        guardar(viejo / 'grafo_piso1.json', grafo_base())
+        guardar(viejo / 'grafo_piso2.json', grafo_base())
+
+        _, actualizados = self.generar_y_aplicar(viejo, viejo, self.tmp / 'salida')
+        self.assertEqual(actualizados, 0)
+        self.assertEqual(sorted(p.name for p in (self.tmp / 'salida').iterdir()),
+                         ['grafo_piso1.json', 'grafo_piso2.json'])
+
+    def test_base_incorrecta_no_escribe_nada(self):
+        viejo, nuevo, otra = self.tmp / 'viejo', self.tmp / 'nuevo', self.tmp / 'otra'
+        guardar(viejo / 'grafo_piso1.json', grafo_base())
+        modificado = grafo_base()
+        modificado['nodos'][0]['x'] = 99
+        guardar(nuevo / 'grafo_piso1.json', modificado)
+        guardar(otra / 'grafo_piso1.json', modificado)
+
+        with redirect_stdout(StringIO()):
+            parche = generar_parche(str(viejo), str(nuevo))
+            resultado = aplicar_parche(str(otra), parche, str(self.tmp / 'salida'))
+        self.assertEqual(resultado, -1)
+        self.assertFalse((self.tmp / 'salida').exists())
+
+    def test_nombres_fuera_de_la_carpeta_se_rechazan(self):
+        datos = self.tmp / 'datos'
+        guardar(datos / 'grafo_piso1.json', grafo_base())
+        victima = self.tmp / 'victima.txt'
+        victima.write_text('no borrar', encoding='utf-8')
+        hash_vacio = hash_grafo({'nodos': [], 'conexiones': []})
+
+        for nombre in ('../victima.txt', '..\\victima.txt', str(victima), 'otro.json'):
+            parche = {'formato': 'delta_grafo', 'version': 1,
+                      'archivos': {nombre: {'hash_base': hash_vacio, 'eliminado': True}}}
+            with self.subTest(nombre=nombre), redirect_stdout(StringIO()):
+                self.assertEqual(aplicar_parche(str(datos), parche, str(self.tmp / 'salida')), -1)
+        self.assertTrue(victima.exists())
+
+    def test_parche_mal_formado(self):
+        datos = self.tmp / 'datos'
+        guardar(datos / 'grafo_piso1.json', grafo_base())
+        parches = [
+            [1, 2],
+            {'formato': 'delta_grafo', 'version': 1},
+            {'formato': 'delta_grafo', 'version': 1, 'archivos': {'grafo_piso1.json': 5}},
+            {'formato': 'delta_grafo', 'version': 1,
+             'archivos': {'grafo_piso1.json': {'hash_base': hash_grafo(grafo_base())}}},
+        ]
+        for parche in parches:
+            with self.subTest(parche=parche), redirect_stdout(StringIO()):
+                self.assertEqual(aplicar_parche(str(datos), parche, str(self.tmp / 'salida')), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
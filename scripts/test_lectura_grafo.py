@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pruebas del Lector Incremental de Grafos
+Sistema de Navegación Interior - UMAG
+
+Compara iterar_nodos_json() con json.load() sobre grafos aleatorios leídos
+con bloques muy pequeños, para que todos los valores queden cortados en los
+límites de bloque.
+
+Uso:
+    python test_lectura_grafo.py
+    python -m pytest scripts/test_lectura_grafo.py
+"""
+
+import json
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Importar funciones compartidas de lectura de grafos
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import iterar_nodos_json
+
+GRAFOS_ALEATORIOS = 300
+
+
+def valor_aleatorio(rng, profundidad=0):
+    """Genera un valor JSON con números, strings con escapes y anidamiento."""
+    opciones = ['entero', 'decimal', 'exponente', 'string', 'literal']
+    if profundidad < 2:
+        opciones += ['lista', 'objeto']
+    tipo = rng.choice(opciones)
+    if tipo == 'entero':
+        return rng.randint(-10 ** 6, 10 ** 6)
+    if tipo == 'decimal':
+        return round(rng.uniform(-2000, 2000), rng.randint(1, 6))
+    if tipo == 'exponente':
+        return rng.uniform(-1, 1) * 10 ** rng.randint(-12, 12)
+    if tipo == 'string':
+        return ''.join(rng.choice('ab "\\/ñ{}[],:é\n\t') for _ in range(rng.randint(0, 12)))
+    if tipo == 'literal':
+        return rng.choice([True, False, None])
+    if tipo == 'lista':
+        return [valor_aleatorio(rng, profundidad + 1) for _ in range(rng.randint(0, 4))]
+    return {f"k{i}": valor_aleatorio(rng, profundidad + 1) for i in range(rng.randint(0, 4))}
+
+
+def grafo_aleatorio(rng):
+    """Genera un grafo con claves extra antes y después de 'nodos'."""
+    nodos = [{'id': f"P{rng.randint(1, 4)}_Nodo_{i}",
+              'x': valor_aleatorio(rng), 'y': rng.uniform(0, 800),
+              'extra': valor_aleatorio(rng)}
+             for i in range(rng.randint(0, 8))]
+    claves = [('escala', rng.uniform(0, 1)), ('meta', valor_aleatorio(rng)),
+              ('conexiones', [valor_aleatorio(rng) for _ in range(rng.randint(0, 5))])]
+    rng.shuffle(claves)
+    posicion = rng.randint(0, len(claves))
+    claves.insert(posicion, ('nodos', nodos))
+    return dict(claves)
+
+
+class PruebasLecturaIncremental(unittest.TestCase):
+
+    def leer(self, texto, tamano_bloque):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8',
+                                         delete=False) as f:
+            f.write(texto)
+        try:
+            return list(iterar_nodos_json(f.name, tamano_bloque))
+        finally:
+            Path(f.name).unlink()
+
+    def test_bloques_pequenos_igual_que_json_load(self):
+        rng = random.Random(0)
+        for i in range(GRAFOS_ALEATORIOS):
+            grafo = grafo_aleatorio(rng)
+            texto = json.dumps(grafo, ensure_ascii=rng.random() < 0.5,
+                               indent=rng.choice([None, 1, 2]))
+            for tamano_bloque in (1, 2, 3, 7):
+                with self.subTest(grafo=i, tamano_bloque=tamano_bloque):
+                    self.assertEqual(self.leer(texto, tamano_bloque), json.loads(texto)['nodos'])
+
+    def test_archivo_truncado_lanza_error(self):
+        texto = json.dumps(grafo_aleatorio(random.Random(1)), indent=1)
+        for corte in range(len(texto.rstrip()) - 1, 0, -7):
+            with self.subTest(corte=corte), self.assertRaises(json.JSONDecodeError):
+                self.leer(texto[:corte], 3)
+
+    def test_decimal_cortado_en_bloque_por_defecto(self):
+        relleno = 'a' * (65536 - len('{"relleno": "", "escala": 0.'))
+        texto = f'{{"relleno": "{relleno}", "escala": 0.25, "nodos": [{{"id": "P1_A"}}]}}'
+        self.assertEqual(texto[65534:65536], '0.')
+        self.assertEqual(self.leer(texto, 64 * 1024), [{'id': 'P1_A'}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ Este script verifica que los QRs generados sean compatibles con la aplicación.
 """
 
 import json
+import re
 import sys
 import os
 from pathlib import Path
@@ -16,6 +17,69 @@ from pathlib import Path
 if sys.platform.startswith('win'):
     os.system('chcp 65001 >nul 2>&1')
 
+# Importar funciones compartidas de lectura de grafos
+sys.path.insert(0, str(Path(__file__).parent))
+from datos_grafo import etapa_payloads, iterar_nodos_json
+
+# ID directo de nodo: "P{piso}_{nombre}"
+PATRON_ID_NODO = re.compile(r'^P(\d+)_')
+
+def _es_entero(valor):
+    """True si el valor es un entero JSON (bool no cuenta)."""
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+def _es_numero(valor):
+    """True si el valor es un número JSON (bool no cuenta)."""
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def verificar_datos_qr(data):
+    """
+    Verifica los campos de un QR ya decodificado.
+    
+    Args:
+        data (dict): Datos del QR (formato JSON de la app)
+        
+    Returns:
+        tuple: (es_valido, mensaje)
+    """
+    if not isinstance(data, dict):
+        return (False, "El QR no es un objeto JSON")
+    
+    # Verificar que tenga el campo 'type'
+    if 'type' not in data:
+        return (False, "Falta el campo 'type'")
+    
+    tipo = data['type']
+    
+    # Validar según el tipo (los tipos siguen los casts de codigo_qr.dart)
+    if tipo == 'nodo':
+        if 'id' not in data:
+            return (False, "QR tipo 'nodo' debe tener campo 'id'")
+        if 'piso' not in data:
+            return (False, "QR tipo 'nodo' debe tener campo 'piso'")
+        if not isinstance(data['id'], str):
+            return (False, "El campo 'id' debe ser texto")
+        if data['piso'] is not None and not _es_entero(data['piso']):
+            return (False, "El campo 'piso' debe ser un número entero")
+        return (True, f"✓ QR nodo válido: {data['id']}")
+    
+    elif tipo == 'ruta':
+        if 'origen' not in data or 'destino' not in data:
+            return (False, "QR tipo 'ruta' debe tener 'origen' y 'destino'")
+        if not isinstance(data['origen'], str) or not isinstance(data['destino'], str):
+            return (False, "Los campos 'origen' y 'destino' deben ser texto")
+        return (True, f"✓ QR ruta válido: {data['origen']} → {data['destino']}")
+    
+    elif tipo in ['coordenadas', 'coord']:
+        if 'x' not in data or 'y' not in data:
+            return (False, "QR tipo coordenadas debe tener 'x' e 'y'")
+        if not _es_numero(data['x']) or not _es_numero(data['y']):
+            return (False, "Los campos 'x' e 'y' deben ser números")
+        return (True, f"✓ QR coordenadas válido: ({data['x']}, {data['y']})")
+    
+    else:
+        return (False, f"Tipo '{tipo}' no reconocido")
+
 def verificar_qr_json(qr_data):
     """
     Verifica que un QR en formato JSON sea válido.
@@ -27,100 +91,200 @@ def verificar_qr_json(qr_data):
         tuple: (es_valido, mensaje)
     """
     try:
-        data = json.loads(qr_data)
-        
-        # Verificar que tenga el campo 'type'
-        if 'type' not in data:
-            return (False, "Falta el campo 'type'")
-        
-        tipo = data['type']
-        
-        # Validar según el tipo
-        if tipo == 'nodo':
-            if 'id' not in data:
-                return (False, "QR tipo 'nodo' debe tener campo 'id'")
-            if 'piso' not in data:
-                return (False, "QR tipo 'nodo' debe tener campo 'piso'")
-            return (True, f"✓ QR nodo válido: {data['id']}")
-        
-        elif tipo == 'ruta':
-            if 'origen' not in data or 'destino' not in data:
-                return (False, "QR tipo 'ruta' debe tener 'origen' y 'destino'")
-            return (True, f"✓ QR ruta válido: {data['origen']} → {data['destino']}")
-        
-        elif tipo in ['coordenadas', 'coord']:
-            if 'x' not in data or 'y' not in data:
-                return (False, "QR tipo coordenadas debe tener 'x' e 'y'")
-            return (True, f"✓ QR coordenadas válido: ({data['x']}, {data['y']})")
-        
-        else:
-            return (False, f"Tipo '{tipo}' no reconocido")
+        return verificar_datos_qr(json.loads(qr_data))
     
     except json.JSONDecodeError as e:
         return (False, f"Error al decodificar JSON: {e}")
     except Exception as e:
         return (False, f"Error inesperado: {e}")
 
+def _piso_de_id(nodo_id):
+    """Extrae el piso de un ID de nodo, o None si no tiene prefijo P{n}_."""
+    m = PATRON_ID_NODO.match(nodo_id)
+    return int(m.group(1)) if m else None
+
+def interpretar_qr_texto(qr_data, alias=None):
+    """
+    Convierte un QR en formato texto a los mismos datos que el formato JSON.
+    
+    Sigue las reglas de QRUtils.parseQRCode() en codigo_qr.dart.
+    
+    Args:
+        qr_data (str): Contenido del QR (ej: "nodo:P1_Entrada_1")
+        alias (dict): Alias -> ID de nodo para el formato "ubicacion:"
+        
+    Returns:
+        tuple: (datos o None, mensaje de error o None)
+    """
+    if qr_data.startswith('nodo:'):
+        nodo_id = qr_data[len('nodo:'):]
+        return {'type': 'nodo', 'id': nodo_id, 'piso': _piso_de_id(nodo_id)}, None
+    
+    if qr_data.startswith('ubicacion:'):
+        nombre = qr_data[len('ubicacion:'):]
+        nodo_id = (alias or {}).get(nombre)
+        if nodo_id is None:
+            return None, f'Alias "{nombre}" no encontrado'
+        return {'type': 'nodo', 'id': nodo_id, 'piso': _piso_de_id(nodo_id)}, None
+    
+    if qr_data.startswith('ruta:'):
+        partes = qr_data[len('ruta:'):].split('|')
+        if len(partes) != 2:
+            return None, "Formato de ruta inválido. Use: ruta:origen|destino"
+        return {'type': 'ruta', 'origen': partes[0], 'destino': partes[1]}, None
+    
+    if qr_data.startswith('piso:'):
+        piso = None
+        nodo_id = None
+        for parte in qr_data.split('|'):
+            if parte.startswith('piso:'):
+                try:
+                    piso = int(parte[len('piso:'):])
+                except ValueError:
+                    piso = None
+            elif parte.startswith('nodo:'):
+                nodo_id = parte[len('nodo:'):]
+        if piso is None or nodo_id is None:
+            return None, "Formato piso inválido. Use: piso:1|nodo:P1_Entrada_1"
+        return {'type': 'nodo', 'id': nodo_id, 'piso': piso}, None
+    
+    if qr_data.startswith('coord:'):
+        coords = qr_data[len('coord:'):].split(',')
+        try:
+            if len(coords) == 2:
+                return {'type': 'coord', 'x': float(coords[0]), 'y': float(coords[1])}, None
+        except ValueError:
+            pass
+        return None, "Formato coordenadas inválido. Use: coord:1004,460"
+    
+    if PATRON_ID_NODO.match(qr_data):
+        return {'type': 'nodo', 'id': qr_data, 'piso': _piso_de_id(qr_data)}, None
+    
+    if alias and qr_data in alias:
+        return {'type': 'nodo', 'id': alias[qr_data], 'piso': _piso_de_id(alias[qr_data])}, None
+    
+    return None, f"Formato QR no reconocido: {qr_data[:50]}"
+
+def verificar_qr(qr_data, alias=None):
+    """
+    Verifica un QR en cualquiera de los formatos soportados por la app.
+    
+    Args:
+        qr_data (str): Contenido del QR (JSON o texto)
+        alias (dict): Alias -> ID de nodo para el formato "ubicacion:"
+        
+    Returns:
+        tuple: (es_valido, mensaje, datos o None)
+    """
+    # Igual que QRUtils.parseQRCode(): se ignoran los espacios de los extremos
+    qr_data = qr_data.strip()
+    
+    datos = None
+    if qr_data.startswith('{') and qr_data.endswith('}'):
+        try:
+            datos = json.loads(qr_data)
+        except json.JSONDecodeError:
+            pass
+        if not isinstance(datos, dict):
+            # La app sigue con los formatos de texto si no es un objeto JSON
+            datos = None
+    
+    if datos is None:
+        datos, error = interpretar_qr_texto(qr_data, alias)
+        if datos is None:
+            return (False, error, None)
+    
+    es_valido, mensaje = verificar_datos_qr(datos)
+    return (es_valido, mensaje, datos if es_valido else None)
+
+def verificar_qr_lote(payloads, alias=None, cache=None):
+    """
+    Verifica un lote de QRs, validando cada contenido distinto una sola vez.
+    
+    En los registros de escaneo los mismos stickers se repiten miles de
+    veces, por lo que reutilizar el resultado evita casi todo el trabajo.
+    
+    Args:
+        payloads (list): Contenidos de QR a verificar
+        alias (dict): Alias -> ID de nodo para el formato "ubicacion:"
+        cache (dict): Resultados previos a reutilizar entre lotes (se actualiza)
+        
+    Returns:
+        list: Un resultado (es_valido, mensaje, datos) por payload
+    """
+    if cache is None:
+        cache = {}
+    
+    for qr_data in set(payloads).difference(cache):
+        cache[qr_data] = verificar_qr(qr_data, alias)
+    
+    return [cache[qr_data] for qr_data in payloads]
+
+def etapa_verificar(payloads):
+    """
+    Verifica cada payload generado.
+    
+    Yields:
+        tuple: (qr_data, es_valido, mensaje)
+    """
+    for _, qr_data in payloads:
+        es_valido, mensaje = verificar_qr_json(qr_data)
+        yield qr_data, es_valido, mensaje
+
 def probar_qr_desde_grafo(ruta_grafo):
     """
     Prueba el formato de QRs que se generarían desde un grafo.
     
+    Usa las mismas etapas en streaming que el generador, así que verifica
+    todos los nodos sin cargar el archivo completo en memoria.
+    
     Args:
         ruta_grafo (str): Ruta al archivo JSON del grafo
+        
+    Returns:
+        bool: True si el grafo se leyó completo y todos los QRs son válidos
     """
+    if not Path(ruta_grafo).exists():
+        print(f"❌ Archivo no encontrado: {ruta_grafo}")
+        return False
+    
+    print(f"\n📂 Probando: {ruta_grafo}")
+    print("─" * 70)
+    
+    total = 0
+    invalidos = 0
+    
+    # Generar QRs como lo hace el script y verificarlos uno a uno
+    nodos = iterar_nodos_json(ruta_grafo)
     try:
-        with open(ruta_grafo, 'r', encoding='utf-8') as f:
-            grafo = json.load(f)
-        
-        nodos = grafo.get('nodos', [])
-        if not nodos:
-            print(f"⚠️  No hay nodos en {ruta_grafo}")
-            return
-        
-        print(f"\n📂 Probando: {ruta_grafo}")
-        print(f"📍 Total de nodos: {len(nodos)}")
-        print("─" * 70)
-        
-        # Probar primeros 3 nodos
-        for i, nodo in enumerate(nodos[:3], 1):
-            nodo_id = nodo.get('id', '')
-            
-            # Extraer piso del ID
-            piso = 1
-            try:
-                if '_' in nodo_id and nodo_id.startswith('P'):
-                    piso = int(nodo_id.split('_')[0].replace('P', ''))
-            except (ValueError, IndexError):
-                pass
-            
-            # Generar QR como lo hace el script
-            qr_data = json.dumps({
-                "type": "nodo",
-                "id": nodo_id,
-                "piso": piso,
-                "x": nodo.get('x'),
-                "y": nodo.get('y')
-            }, ensure_ascii=False)
-            
-            # Verificar
-            es_valido, mensaje = verificar_qr_json(qr_data)
-            
-            if es_valido:
-                print(f"  [{i}] {mensaje}")
-            else:
+        for i, (qr_data, es_valido, mensaje) in enumerate(etapa_verificar(etapa_payloads(nodos, 1)), 1):
+            total = i
+            if not es_valido:
+                invalidos += 1
                 print(f"  [{i}] ✗ {mensaje}")
                 print(f"      QR: {qr_data[:100]}...")
-        
-        if len(nodos) > 3:
-            print(f"  ... (y {len(nodos) - 3} nodos más)")
-        
-        print("─" * 70)
-        print(f"✅ Formato de QRs verificado\n")
-        
-    except FileNotFoundError:
-        print(f"❌ Archivo no encontrado: {ruta_grafo}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
+            elif i <= 3:
+                # Mostrar los primeros 3 nodos como muestra
+                print(f"  [{i}] {mensaje}")
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Error al leer el grafo después de {total} nodos: {e}")
+        return False
+    
+    if total == 0:
+        print(f"⚠️  No hay nodos en {ruta_grafo}")
+        return False
+    
+    if total > 3:
+        print(f"  ... (y {total - 3} nodos más)")
+    
+    print("─" * 70)
+    print(f"📍 Total de nodos: {total}")
+    if invalidos > 0:
+        print(f"⚠️  {invalidos} QRs con formato inválido\n")
+        return False
+    
+    print(f"✅ Formato de QRs verificado\n")
+    return True
 
 def main():
     """Función principal del script."""
@@ -140,10 +304,11 @@ def main():
         'lib/data/grafo_piso4.json',
     ]
     
+    todos_validos = True
     for grafo_path in grafos:
         ruta_completa = directorio_base / grafo_path
         if ruta_completa.exists():
-            probar_qr_desde_grafo(str(ruta_completa))
+            todos_validos &= probar_qr_desde_grafo(str(ruta_completa))
     
     print("\n" + "=" * 70)
     print("📱 FORMATOS QR SOPORTADOS POR LA APP:")
@@ -166,7 +331,7 @@ def main():
 """)
     print("=" * 70 + "\n")
     
-    return 0
+    return 0 if todos_validos else 1
 
 if __name__ == "__main__":
     sys.exit(main())